@@ -0,0 +1,81 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import time
+
+from polofutures import RestClient
+from polofutures.mock.exchange import MockExchange
+
+
+LEVELS = 20
+LATENCY = 0.005
+ROUNDS = 10
+
+
+def ladder(mid):
+    return [{'symbol': 'BTCUSDTPERP', 'side': 'buy', 'leverage': '10', 'size': 1, 'price': str(mid - level)}
+            for level in range(1, LEVELS + 1)]
+
+
+def requote_sequential(trade, order_ids, mid):
+    for order_id in order_ids:
+        trade.cancel_order(order_id)
+
+    return [trade.create_limit_order(**order)['orderId'] for order in ladder(mid)]
+
+
+def requote_batch(trade, order_ids, mid):
+    trade.cancel_orders(order_ids)
+
+    return [item.result['orderId'] for item in trade.create_limit_orders(ladder(mid))]
+
+
+def measure(requote, trade, rounds=ROUNDS):
+    order_ids = requote(trade, [], 30000)
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        order_ids = requote(trade, order_ids, 30000 + i)
+
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run(quick=False):
+    rounds = 2 if quick else ROUNDS
+
+    with MockExchange(latency=LATENCY) as server:
+        client = RestClient('key', 'secret', 'passphrase', base_url=server.base_url, pool_size=8)
+        trade = client.trade_api()
+
+        sequential = measure(requote_sequential, trade, rounds)
+        batch = measure(requote_batch, trade, rounds)
+
+        client.close()
+
+    return {'levels': LEVELS, 'latency_ms': LATENCY * 1000, 'sequential_ms': sequential, 'batch_ms': batch}
+
+
+def main():
+    result = run()
+
+    print(f'{LEVELS} level ladder re-quote, {LATENCY * 1000:.0f}ms server latency')
+    print(f'sequential {result["sequential_ms"]:8.1f} ms')
+    print(f'batch      {result["batch_ms"]:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
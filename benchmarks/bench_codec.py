@@ -0,0 +1,116 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import json
+import random
+import sys
+import timeit
+
+from polofutures.codec import codecs
+
+
+def synthetic_feed(count=5000, symbol='BTCUSDTPERP'):
+    # frames shaped like the level2, execution and ticker pushes of the public feed
+    rng = random.Random(7)
+    frames = []
+    sequence = 1000000
+
+    for i in range(count):
+        sequence += 1
+        price = 30000 + rng.randint(-500, 500) / 10
+        kind = rng.random()
+
+        if kind < 0.8:
+            msg = {
+                'subject': 'level2',
+                'topic': f'/contractMarket/level2:{symbol}',
+                'type': 'message',
+                'data': {'sequence': sequence, 'change': f'{price},{rng.choice(["buy", "sell"])},{rng.randint(0, 5000)}',
+                         'timestamp': 1700000000000 + i}
+            }
+        elif kind < 0.95:
+            msg = {
+                'subject': 'match',
+                'topic': f'/contractMarket/execution:{symbol}',
+                'type': 'message',
+                'data': {'symbol': symbol, 'sequence': sequence, 'side': 'buy', 'matchSize': rng.randint(1, 50),
+                         'size': rng.randint(1, 50), 'price': str(price), 'takerOrderId': '%024x' % rng.getrandbits(96),
+                         'ts': 1700000000000000000 + i, 'makerOrderId': '%024x' % rng.getrandbits(96),
+                         'tradeId': '%024x' % rng.getrandbits(96)}
+            }
+        else:
+            msg = {
+                'subject': 'ticker',
+                'topic': f'/contractMarket/ticker:{symbol}',
+                'type': 'message',
+                'data': {'symbol': symbol, 'sequence': sequence, 'side': 'sell', 'price': str(price), 'size': 3,
+                         'tradeId': '%024x' % rng.getrandbits(96), 'bestBidSize': 795, 'bestBidPrice': str(price - 0.1),
+                         'bestAskPrice': str(price), 'bestAskSize': 30, 'ts': 1700000000000000000 + i}
+            }
+
+        frames.append(json.dumps(msg))
+
+    return frames
+
+
+def load_frames(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line for line in f.read().splitlines() if line]
+
+
+def run(quick=False, frames=None):
+    frames = frames or synthetic_feed(1000 if quick else 5000)
+    raw = [frame.encode('utf-8') for frame in frames]
+    messages = [json.loads(frame) for frame in frames]
+
+    results = {
+        'frames'       : len(frames),
+        'average_bytes': sum(map(len, raw)) / len(raw)
+    }
+
+    for name, codec in codecs.items():
+        loads = codec.loads
+        dumps = codec.dumps
+
+        decode_str = min(timeit.repeat(lambda: [loads(frame) for frame in frames], number=5, repeat=3)) / 5
+        decode_bytes = min(timeit.repeat(lambda: [loads(frame) for frame in raw], number=5, repeat=3)) / 5
+        encode = min(timeit.repeat(lambda: [dumps(msg) for msg in messages], number=5, repeat=3)) / 5
+
+        results[name] = {
+            'loads_str_ns'  : decode_str / len(frames) * 1e9,
+            'loads_bytes_ns': decode_bytes / len(frames) * 1e9,
+            'dumps_ns'      : encode / len(frames) * 1e9
+        }
+
+    return results
+
+
+def main():
+    results = run(frames=load_frames(sys.argv[1]) if len(sys.argv) > 1 else None)
+
+    print(f'{results["frames"]} frames, {results["average_bytes"]:.0f} bytes average')
+
+    for name in codecs:
+        result = results[name]
+
+        print(f'{name:<8} loads(str) {result["loads_str_ns"]:7.0f} ns  '
+              f'loads(bytes) {result["loads_bytes_ns"]:7.0f} ns  '
+              f'dumps {result["dumps_ns"]:7.0f} ns')
+
+
+if __name__ == '__main__':
+    main()
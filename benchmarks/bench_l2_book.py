@@ -0,0 +1,93 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import random
+import time
+
+from polofutures.book.l2 import L2OrderBook, L2OrderBookSync
+
+
+DELTAS = 500000
+LEVELS = 2000
+
+
+def generate(count, rng):
+    # mostly size updates close to the top of book, with levels appearing and disappearing
+    changes = []
+
+    for _ in range(count):
+        side = rng.choice(('buy', 'sell'))
+        offset = int(rng.expovariate(1 / 40)) % LEVELS + 1
+        price = 30000 - offset * 0.5 if side == 'buy' else 30000 + offset * 0.5
+        size = 0 if rng.random() < 0.2 else rng.randint(1, 5000)
+
+        changes.append(f'{price},{side},{size}')
+
+    return changes
+
+
+def snapshot(sequence):
+    return {
+        'sequence': sequence,
+        'bids': [[30000 - level * 0.5, 100] for level in range(1, LEVELS + 1)],
+        'asks': [[30000 + level * 0.5, 100] for level in range(1, LEVELS + 1)]
+    }
+
+
+def run(quick=False):
+    deltas = DELTAS // 10 if quick else DELTAS
+    changes = generate(deltas, random.Random(11))
+    results = {}
+
+    book = L2OrderBook('BTCUSDTPERP')
+    book.load_snapshot(snapshot(0))
+
+    start = time.perf_counter()
+    for change in changes:
+        book.apply_change(change)
+    results['apply_change_per_s'] = deltas / (time.perf_counter() - start)
+
+    sync = L2OrderBookSync(None, 'BTCUSDTPERP')
+    sync._load_snapshot(snapshot(0))
+    sync.sequence = 0
+
+    messages = [{'data': {'sequence': sequence, 'change': change}} for sequence, change in enumerate(changes, 1)]
+
+    start = time.perf_counter()
+    for msg in messages:
+        sync.on_message(msg)
+    results['sync_on_message_per_s'] = deltas / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(deltas):
+        book.best_bid()
+        book.best_ask()
+    results['best_bid_ask_per_s'] = deltas / (time.perf_counter() - start)
+
+    return results
+
+
+def main():
+    results = run()
+
+    print(f'apply_change        {results["apply_change_per_s"]:12,.0f} deltas/s')
+    print(f'sync.on_message     {results["sync_on_message_per_s"]:12,.0f} deltas/s')
+    print(f'best bid + ask      {results["best_bid_ask_per_s"]:12,.0f} reads/s')
+
+
+if __name__ == '__main__':
+    main()
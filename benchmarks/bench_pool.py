@@ -0,0 +1,66 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import statistics
+import time
+
+from polofutures.rest.core import SendRequest
+from polofutures.rest.pool import ConnectionPool
+
+from polofutures.mock.exchange import MockExchange
+
+
+ROUNDS = 2000
+
+
+def measure(request, rounds=ROUNDS):
+    samples = []
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        request('GET', '/api/v1/ticker', {'symbol': 'BTCUSDTPERP'})
+        samples.append(time.perf_counter() - start)
+
+    samples.sort()
+
+    return {
+        'mean_us': statistics.mean(samples) * 1e6,
+        'p50_us' : samples[len(samples) // 2] * 1e6,
+        'p99_us' : samples[int(len(samples) * 0.99)] * 1e6
+    }
+
+
+def run(quick=False):
+    rounds = ROUNDS // 10 if quick else ROUNDS
+
+    with MockExchange() as server:
+        unpooled = measure(SendRequest(base_url=server.base_url), rounds)
+
+        pool = ConnectionPool(pool_size=4)
+        pooled = measure(SendRequest(base_url=server.base_url, pool=pool), rounds)
+        pool.close()
+
+    return {'unpooled': unpooled, 'pooled': pooled}
+
+
+def main():
+    for name, result in run().items():
+        print(f'{name:<10} mean {result["mean_us"]:8.1f}us  p50 {result["p50_us"]:8.1f}us  p99 {result["p99_us"]:8.1f}us')
+
+
+if __name__ == '__main__':
+    main()
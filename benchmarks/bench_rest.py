@@ -0,0 +1,103 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+import statistics
+import time
+
+from polofutures import AsyncRestClient, RestClient
+from polofutures.mock.exchange import MockExchange
+
+
+ROUNDS = 2000
+CONCURRENCY = 32
+
+
+def latency(samples):
+    samples.sort()
+
+    return {
+        'mean_us': statistics.mean(samples) * 1e6,
+        'p50_us' : samples[len(samples) // 2] * 1e6,
+        'p99_us' : samples[int(len(samples) * 0.99)] * 1e6
+    }
+
+
+def blocking_round_trips(base_url, rounds):
+    # public and signed calls through RestClient, the exchange runs in its own thread
+    client = RestClient('key', 'secret', 'passphrase', base_url=base_url)
+    market = client.market_api()
+    trade = client.trade_api()
+
+    results = {}
+    for name, call in (('get_ticker', lambda: market.get_ticker('BTCUSDTPERP')),
+                       ('get_order_list', lambda: trade.get_order_list(status='active'))):
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - start)
+
+        results[name] = latency(samples)
+
+    client.close()
+
+    return results
+
+
+async def async_throughput(rounds):
+    async with MockExchange() as exchange:
+        client = AsyncRestClient('key', 'secret', 'passphrase', base_url=exchange.base_url, pool_size=CONCURRENCY)
+        market = client.market_api()
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def call():
+            async with semaphore:
+                await market.get_ticker('BTCUSDTPERP')
+
+        start = time.perf_counter()
+        await asyncio.gather(*[call() for _ in range(rounds)])
+        elapsed = time.perf_counter() - start
+
+        await client.close()
+
+    return rounds / elapsed
+
+
+def run(quick=False):
+    rounds = ROUNDS // 10 if quick else ROUNDS
+
+    with MockExchange() as exchange:
+        results = blocking_round_trips(exchange.base_url, rounds)
+
+    results['async_requests_per_s'] = asyncio.run(async_throughput(rounds))
+
+    return results
+
+
+def main():
+    results = run()
+
+    for name in ('get_ticker', 'get_order_list'):
+        result = results[name]
+        print(f'{name:<16} mean {result["mean_us"]:8.1f}us  p50 {result["p50_us"]:8.1f}us  p99 {result["p99_us"]:8.1f}us')
+
+    print(f'async get_ticker {results["async_requests_per_s"]:8,.0f} requests/s at concurrency {CONCURRENCY}')
+
+
+if __name__ == '__main__':
+    main()
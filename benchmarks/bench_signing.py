@@ -0,0 +1,97 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+import timeit
+from urllib.parse import urljoin
+
+from polofutures.rest.core import SendRequest
+
+
+ROUNDS = 200000
+
+CASES = [
+    ('GET with params', 'GET',    '/api/v1/orders', {'status': 'active', 'symbol': 'BTCUSDTPERP', 'side': 'buy'}),
+    ('DELETE',          'DELETE', '/api/v1/orders/5cdfc138b21023a909e5ad55', None),
+    ('POST json body',  'POST',   '/api/v1/orders', {'symbol': 'BTCUSDTPERP', 'size': 1, 'side': 'buy', 'price': '8600',
+                                                     'leverage': '30', 'clientOid': '5c52e11203aa677f33e493fb'})
+]
+
+
+def legacy_prepare(key, secret, passphrase, base_url, method, path, params):
+    # signing path as it was before the prepared HMAC state and header templates
+    body = None
+
+    if params:
+        if method in ['GET', 'DELETE']:
+            params = [f'{key}={value}' for key, value in params.items()]
+            params = '&'.join(params)
+            path += '?' + params
+        else:
+            body = json.dumps(params)
+
+    headers = {
+        'Content-Type': 'application/json'
+    }
+
+    now = int(time.time()) * 1000
+    str_to_sign = str(now) + method + path + (body or '')
+    signature = hmac.new(secret, str_to_sign.encode('utf-8'), hashlib.sha256)
+    signature = signature.digest()
+    signature = base64.b64encode(signature)
+
+    headers.update({
+        'PF-API-SIGN'      : signature,
+        'PF-API-TIMESTAMP' : str(now),
+        'PF-API-KEY'       : key,
+        'PF-API-PASSPHRASE': passphrase
+    })
+
+    return urljoin(base_url, path), headers, body
+
+
+def ns_per_call(func, rounds):
+    return min(timeit.repeat(func, number=rounds, repeat=5)) / rounds * 1e9
+
+
+def run(quick=False):
+    rounds = ROUNDS // 20 if quick else ROUNDS
+    request = SendRequest('key', 'secret', 'passphrase')
+    results = {}
+
+    for name, method, path, params in CASES:
+        fast = ns_per_call(lambda: request._prepare(method, path, params, True), rounds)
+        legacy = ns_per_call(lambda: legacy_prepare('key', b'secret', 'passphrase', request._base_url, method, path,
+                                                     params), rounds)
+
+        results[name] = {'ns_per_request': fast, 'legacy_ns_per_request': legacy}
+
+    return results
+
+
+def main():
+    for name, result in run().items():
+        print(f'{name:<16} {result["ns_per_request"]:8.0f} ns/request  '
+              f'(legacy {result["legacy_ns_per_request"]:8.0f} ns/request)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+import time
+
+from polofutures import Instrumentation, WsClient
+from polofutures.mock.exchange import MockExchange
+
+from benchmarks.bench_codec import synthetic_feed
+
+
+FRAMES = 100000
+FANOUT = (10, 100, 500)
+TOPIC = '/contractMarket/level2:BTCUSDTPERP'
+
+
+async def receive_rate(exchange, frames, instrumentation=None):
+    # frames per second from the socket through the receive loop into on_message
+    received = 0
+    done = asyncio.Event()
+
+    def on_message(msg):
+        nonlocal received
+        received += 1
+        if received == len(frames):
+            done.set()
+
+    client = WsClient(on_message, base_url=exchange.base_url, instrumentation=instrumentation)
+    await client.connect()
+    await client.subscribe(TOPIC)
+
+    start = time.perf_counter()
+    await exchange.publish(TOPIC, frames)
+    await asyncio.wait_for(done.wait(), timeout=120)
+    elapsed = time.perf_counter() - start
+
+    await client.disconnect()
+
+    return len(frames) / elapsed
+
+
+async def fanout(exchange, count):
+    # time until count concurrent subscriptions are all acknowledged
+    client = WsClient(lambda msg: None, base_url=exchange.base_url)
+    await client.connect()
+
+    topics = [f'/contractMarket/level2:SYM{i}' for i in range(count)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client.subscribe(topic) for topic in topics])
+    elapsed = time.perf_counter() - start
+
+    await client.disconnect()
+
+    return elapsed * 1000
+
+
+async def measure(quick):
+    frames = synthetic_feed(FRAMES // 10 if quick else FRAMES)
+    results = {'frames': len(frames)}
+
+    # no generated feed, the benchmark publishes its own frames
+    async with MockExchange(feed_rates={'/contractMarket/level2': 0}) as exchange:
+        results['frames_per_s'] = await receive_rate(exchange, frames)
+        results['frames_per_s_instrumented'] = await receive_rate(exchange, frames, Instrumentation())
+
+        results['subscribe_ms'] = {str(count): await fanout(exchange, count) for count in FANOUT}
+
+    return results
+
+
+def run(quick=False):
+    return asyncio.run(measure(quick))
+
+
+def main():
+    results = run()
+
+    print(f'receive loop        {results["frames_per_s"]:12,.0f} frames/s')
+    print(f'  instrumented      {results["frames_per_s_instrumented"]:12,.0f} frames/s')
+
+    for count, elapsed in results['subscribe_ms'].items():
+        print(f'subscribe {count:>4} topics {elapsed:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
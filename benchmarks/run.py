@@ -0,0 +1,72 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+import time
+
+from polofutures.codec import default_codec
+
+
+SUITES = ('signing', 'pool', 'rest', 'batch', 'ws', 'codec', 'l2_book')
+
+
+def environment():
+    return {
+        'python'   : sys.version.split()[0],
+        'platform' : platform.platform(),
+        'machine'  : platform.machine(),
+        'codec'    : default_codec.name,
+        'timestamp': int(time.time())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suites against local mocks.')
+    parser.add_argument('suites', nargs='*', metavar='suite', help=f'One of {", ".join(SUITES)}, all when omitted')
+    parser.add_argument('-o', '--output', help='Write the results as JSON to this file, - for stdout')
+    parser.add_argument('-q', '--quick', action='store_true', help='Fewer rounds, for smoke runs in CI')
+    args = parser.parse_args()
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f'unknown suites: {", ".join(sorted(unknown))}')
+
+    report = {'environment': environment(), 'quick': args.quick, 'results': {}}
+
+    for name in args.suites or SUITES:
+        module = importlib.import_module(f'benchmarks.bench_{name}')
+
+        start = time.perf_counter()
+        report['results'][name] = module.run(quick=args.quick)
+
+        print(f'{name:<10} done in {time.perf_counter() - start:6.1f}s', file=sys.stderr)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+
+    if args.output is None or args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
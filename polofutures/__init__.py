@@ -17,5 +17,19 @@
 
 from __future__ import absolute_import
 
-from .rest.client import RestClient
+from .bars import Bar, BarAggregator
+from .book.l2 import L2OrderBook, L2OrderBookSync
+from .book.l3 import L3OrderBook, L3OrderBookSync
+from .fixed import ContractSpec
+from .instrument import Instrumentation
+from .models import AccountOverview, Execution, Fill, Level2Change, Order, Position, Ticker
+from .rest.batch import BatchResult
+from .rest.cache import ResponseCache
+from .rest.client import RestClient, AsyncRestClient
+from .rest.clock import ClockOffsetEstimator
+from .rest.core import ApiError
+from .rest.ratelimit import RateLimiter
 from .ws.client import WsClient
+from .ws.pool import WsPool
+from .ws.record import Recorder, Replay
+from .ws.router import TopicRouter
@@ -0,0 +1,266 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import time
+
+
+_units = {'s': 1000, 'm': 60000, 'h': 3600000, 'd': 86400000}
+
+
+def interval_ms(interval):
+    """
+    Length in ms of an interval such as '1s', '5m' or '1h'."""
+
+    try:
+        return int(interval[:-1]) * _units[interval[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f'Unknown bar interval {interval!r}') from None
+
+
+class Bar:
+    """
+    One OHLCV bar. start is the open time in ms, turnover the sum of price times size."""
+
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'volume', 'turnover', 'trades')
+
+    def __init__(self, start, price, size):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = size
+        self.turnover = price * size
+        self.trades = 1
+
+    @property
+    def vwap(self):
+        return self.turnover / self.volume if self.volume else self.close
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f'Bar(start={self.start}, open={self.open}, high={self.high}, low={self.low}, close={self.close}, '
+                f'volume={self.volume}, trades={self.trades})')
+
+
+class BarSeries:
+    """
+    Bars of one symbol and interval. Closed bars are kept in a ring of capacity slots, the bar
+    still open is kept apart. A trade is one comparison and a few attribute writes, a bar closes
+    when the first trade of a later interval arrives or advance() passes its end. Intervals
+    without trades produce no bar. Trades older than the open bar are counted as late and dropped."""
+
+    __slots__ = ('symbol', 'interval', 'span', 'capacity', 'current', 'late', '_ring', '_head', '_count',
+                 '_on_bar')
+
+    def __init__(self, symbol, interval, capacity=1000, on_bar=None):
+        self.symbol = symbol
+        self.interval = interval
+        self.span = interval_ms(interval)
+        self.capacity = capacity
+        self.current = None
+        self.late = 0
+
+        self._ring = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self._on_bar = on_bar
+
+    def add(self, ts, price, size):
+        start = ts - ts % self.span
+        bar = self.current
+
+        if bar is not None and start == bar.start:
+            if price > bar.high:
+                bar.high = price
+            elif price < bar.low:
+                bar.low = price
+            bar.close = price
+            bar.volume += size
+            bar.turnover += price * size
+            bar.trades += 1
+            return
+
+        if bar is not None and start < bar.start:
+            self.late += 1
+            return
+
+        if bar is not None:
+            self._close(bar)
+
+        self.current = Bar(start, price, size)
+
+    def advance(self, now):
+        """
+        Close the open bar if its interval ended before now (ms)."""
+
+        bar = self.current
+        if bar is not None and now >= bar.start + self.span:
+            self.current = None
+            self._close(bar)
+
+    def _close(self, bar):
+        self._ring[self._head] = bar
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+        if self._on_bar is not None:
+            self._on_bar(self.symbol, self.interval, bar)
+
+    def bars(self, count=None):
+        """
+        Closed bars, oldest first, at most the last count of them."""
+
+        count = self._count if count is None else min(count, self._count)
+        ring = self._ring
+        head = self._head
+        capacity = self.capacity
+
+        return [ring[(head - count + i) % capacity] for i in range(count)]
+
+    def last(self):
+        return self._ring[(self._head - 1) % self.capacity] if self._count else None
+
+    def __len__(self):
+        return self._count
+
+
+class BarAggregator:
+    """
+    Streaming OHLCV bars per symbol over the /contractMarket/execution feed.
+
+    Pass the aggregator (or its on_message) as a WsClient on_message callback or as a TopicRouter
+    handler for '/contractMarket/execution'. on_bar(symbol, interval, bar) is called for every bar
+    that closes. seed() replays historical trades, e.g. MarketClient.get_trade_history or messages
+    of a Replay, so the bars are warm before the live feed starts.
+
+    Param	    Type	    Description
+    intervals	list	    [optional] Bar intervals. Default 1s, 1m, 5m, 1h
+    capacity	int	        [optional] Closed bars kept per symbol and interval. Default 1000
+    on_bar	    callable	[optional] Called as on_bar(symbol, interval, bar) when a bar closes
+    price_key	callable	[optional] Converts wire prices, e.g. ContractSpec.to_ticks. Default float
+    size_key	callable	[optional] Converts wire sizes. Default int"""
+
+    def __init__(self, intervals=('1s', '1m', '5m', '1h'), capacity=1000, on_bar=None, price_key=float,
+                 size_key=int):
+        self.intervals = tuple(intervals)
+        self.capacity = capacity
+        self.on_bar = on_bar
+
+        self._price_key = price_key
+        self._size_key = size_key
+
+        # symbol -> BarSeries per interval, in the order of intervals
+        self._series = {}
+
+        for interval in self.intervals:
+            interval_ms(interval)
+
+    def _emit(self, symbol, interval, bar):
+        if self.on_bar is not None:
+            self.on_bar(symbol, interval, bar)
+
+    def series(self, symbol, interval):
+        return self._symbol_series(symbol)[self.intervals.index(interval)]
+
+    def _symbol_series(self, symbol):
+        series = self._series.get(symbol)
+
+        if series is None:
+            series = self._series[symbol] = [BarSeries(symbol, interval, self.capacity, self._emit)
+                                             for interval in self.intervals]
+
+        return series
+
+    def add_trade(self, symbol, ts, price, size):
+        """
+        Add one trade, ts in ms, price and size already converted."""
+
+        for series in self._symbol_series(symbol):
+            series.add(ts, price, size)
+
+    def on_message(self, msg):
+        data = msg.get('data')
+        if data is None or msg.get('subject') != 'match':
+            return
+
+        self._add_data(data)
+
+    __call__ = on_message
+
+    def _add_data(self, data, symbol=None):
+        symbol = data.get('symbol', symbol)
+        if symbol is None:
+            raise ValueError(f'Trade {data!r} has no symbol, pass one to seed()')
+
+        ts = int(data['ts'])
+        if ts > 10 ** 14:
+            # execution timestamps are in ns
+            ts //= 1000000
+
+        size = data.get('matchSize')
+        if size is None:
+            size = data['size']
+
+        self.add_trade(symbol, ts, self._price_key(data['price']), self._size_key(size))
+
+    def seed(self, trades, symbol=None):
+        """
+        Add historical trades: execution data dicts as returned by MarketClient.get_trade_history, or
+        execution messages such as those of a Replay. Trades are applied in timestamp order.
+        get_trade_history items carry no symbol, symbol is used for items without one."""
+
+        items = []
+        for trade in trades:
+            if 'subject' in trade:
+                if trade.get('subject') != 'match':
+                    continue
+                trade = trade['data']
+
+            items.append(trade)
+
+        items.sort(key=lambda trade: int(trade['ts']))
+
+        for trade in items:
+            self._add_data(trade, symbol)
+
+    def advance(self, now=None):
+        """
+        Close every open bar whose interval ended before now (ms, default the current time), for
+        consumers that need bars closed on time while no trades arrive."""
+
+        now = int(time.time() * 1000) if now is None else now
+
+        for series in self._series.values():
+            for item in series:
+                item.advance(now)
+
+    def bars(self, symbol, interval, count=None):
+        """
+        Closed bars of symbol and interval, oldest first."""
+
+        return self.series(symbol, interval).bars(count)
+
+    def current(self, symbol, interval):
+        """
+        The bar still open for symbol and interval, or None."""
+
+        return self.series(symbol, interval).current
+
+    @property
+    def symbols(self):
+        return list(self._series)
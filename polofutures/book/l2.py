@@ -0,0 +1,175 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+from bisect import bisect_left, insort
+
+from polofutures.book.sync import SequencedBookSync
+
+
+class PriceLevels:
+    """
+    One side of an aggregated book: sizes by price in a dict plus the prices in a sorted list.
+    A size change on an existing level is a dict write, adding or removing a level is a binary
+    search, and the best price is read from the end of the list."""
+
+    __slots__ = ('_prices', '_sizes', '_bids')
+
+    def __init__(self, bids):
+        self._prices = []
+        self._sizes = {}
+        self._bids = bids
+
+    def update(self, price, size):
+        sizes = self._sizes
+
+        if size:
+            if price not in sizes:
+                insort(self._prices, price)
+            sizes[price] = size
+        elif price in sizes:
+            del sizes[price]
+
+            prices = self._prices
+            del prices[bisect_left(prices, price)]
+
+    def clear(self):
+        self._prices.clear()
+        self._sizes.clear()
+
+    def best(self):
+        prices = self._prices
+        if not prices:
+            return None
+
+        price = prices[-1] if self._bids else prices[0]
+        return price, self._sizes[price]
+
+    def levels(self, depth=None):
+        """
+        (price, size) pairs from the best price outwards."""
+
+        prices = self._prices
+        if self._bids:
+            prices = prices[::-1] if depth is None else prices[:-depth - 1:-1]
+        elif depth is not None:
+            prices = prices[:depth]
+
+        sizes = self._sizes
+        return [(price, sizes[price]) for price in prices]
+
+    def size(self, price):
+        return self._sizes.get(price, 0)
+
+    def __len__(self):
+        return len(self._prices)
+
+
+class L2OrderBook:
+    """
+    Aggregated price level book.
+
+    Param	    Type	    Description
+    symbol	    String	    Symbol of the contract
+    price_key	callable	[optional] Converts wire prices to the keys levels are sorted on. Default float
+    size_key	callable	[optional] Converts wire sizes. Default int"""
+
+    def __init__(self, symbol, price_key=float, size_key=int):
+        self.symbol = symbol
+        self.bids = PriceLevels(bids=True)
+        self.asks = PriceLevels(bids=False)
+
+        self._price_key = price_key
+        self._size_key = size_key
+
+    def load_snapshot(self, snapshot):
+        price_key = self._price_key
+        size_key = self._size_key
+
+        for levels, rows in ((self.bids, snapshot.get('bids') or []), (self.asks, snapshot.get('asks') or [])):
+            levels.clear()
+
+            for price, size in rows:
+                levels.update(price_key(price), size_key(size))
+
+    def apply_change(self, change):
+        """
+        Apply a level2 "price,side,size" change string, a size of 0 removes the level."""
+
+        price, side, size = change.split(',')
+
+        levels = self.bids if side == 'buy' else self.asks
+        levels.update(self._price_key(price), self._size_key(size))
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def spread(self):
+        bid = self.bids.best()
+        ask = self.asks.best()
+
+        if bid is None or ask is None:
+            return None
+
+        return ask[0] - bid[0]
+
+    def depth(self, levels=None):
+        return {
+            'bids': self.bids.levels(levels),
+            'asks': self.asks.levels(levels)
+        }
+
+
+class L2OrderBookSync(SequencedBookSync):
+    """
+    L2OrderBook kept in sync with the /contractMarket/level2 websocket topic.
+
+    Route that topic's messages to on_message and await start() once, gaps are recovered
+    from get_l2_messages or a fresh get_l2_order_book snapshot.
+
+    Param	    Type	    Description
+    market	    object	    MarketClient or AsyncMarketClient used for snapshots and gap fills
+    symbol	    String	    Symbol of the contract
+    max_gap	    int	        [optional] Widest gap filled from get_l2_messages before rebuilding. Default 500
+    on_update	callable	[optional] Called with this object after deltas were applied
+    book	    L2OrderBook	[optional] Book to maintain, one is created by default"""
+
+    def __init__(self, market, symbol, max_gap=500, on_update=None, book=None):
+        super().__init__(max_gap, on_update)
+
+        self._market = market
+        self.symbol = symbol
+        self.book = book or L2OrderBook(symbol)
+
+    def _fetch_snapshot(self):
+        return self._market.get_l2_order_book(self.symbol)
+
+    def _fetch_messages(self, start, end):
+        return self._market.get_l2_messages(self.symbol, start, end)
+
+    def _load_snapshot(self, snapshot):
+        self.book.load_snapshot(snapshot)
+
+    @staticmethod
+    def _parse(msg):
+        data = msg.get('data', msg)
+        return int(data['sequence']), data['change']
+
+    def _apply(self, change):
+        self.book.apply_change(change)
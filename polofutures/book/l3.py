@@ -0,0 +1,289 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+from bisect import bisect_left, insort
+from operator import itemgetter
+
+from polofutures.book.sync import SequencedBookSync
+
+
+class Order:
+    __slots__ = ('order_id', 'side', 'price', 'size', 'ts', 'level')
+
+    def __init__(self, order_id, side, price, size, ts, level):
+        self.order_id = order_id
+        self.side = side
+        self.price = price
+        self.size = size
+        self.ts = ts
+        self.level = level
+
+    def __repr__(self):
+        return f'Order({self.order_id!r}, {self.side!r}, {self.price!r}, {self.size!r})'
+
+
+class PriceLevel:
+    """
+    Orders resting at one price in time priority. The dict keeps insertion order, so appending
+    and removing any order are both constant time."""
+
+    __slots__ = ('price', 'orders', 'size')
+
+    def __init__(self, price):
+        self.price = price
+        self.orders = {}
+        self.size = 0
+
+    def __len__(self):
+        return len(self.orders)
+
+
+class OrderLevels:
+    """
+    One side of an order-by-order book: PriceLevel by price plus the prices in a sorted list."""
+
+    __slots__ = ('_prices', '_levels', '_bids')
+
+    def __init__(self, bids):
+        self._prices = []
+        self._levels = {}
+        self._bids = bids
+
+    def level(self, price, index=True):
+        level = self._levels.get(price)
+
+        if level is None:
+            level = self._levels[price] = PriceLevel(price)
+            if index:
+                insort(self._prices, price)
+
+        return level
+
+    def reindex(self):
+        self._prices = sorted(self._levels)
+
+    def discard(self, level):
+        del self._levels[level.price]
+
+        prices = self._prices
+        del prices[bisect_left(prices, level.price)]
+
+    def clear(self):
+        self._prices.clear()
+        self._levels.clear()
+
+    def best(self):
+        prices = self._prices
+        if not prices:
+            return None
+
+        return self._levels[prices[-1] if self._bids else prices[0]]
+
+    def levels(self, depth=None):
+        prices = self._prices
+        if self._bids:
+            prices = prices[::-1] if depth is None else prices[:-depth - 1:-1]
+        elif depth is not None:
+            prices = prices[:depth]
+
+        levels = self._levels
+        return [levels[price] for price in prices]
+
+    def __len__(self):
+        return len(self._prices)
+
+
+class L3OrderBook:
+    """
+    Order-by-order book with an order id index and a FIFO queue per price level.
+    open, update, match and done messages are applied in constant time apart from adding or
+    removing a price level, which is a binary search.
+
+    Param	    Type	    Description
+    symbol	    String	    Symbol of the contract
+    price_key	callable	[optional] Converts wire prices to the keys levels are sorted on. Default float
+    size_key	callable	[optional] Converts wire sizes. Default int"""
+
+    def __init__(self, symbol, price_key=float, size_key=int):
+        self.symbol = symbol
+        self.bids = OrderLevels(bids=True)
+        self.asks = OrderLevels(bids=False)
+        self.orders = {}
+
+        self._price_key = price_key
+        self._size_key = size_key
+
+        self._handlers = {
+            'open'  : self._open,
+            'update': self._update,
+            'match' : self._match,
+            'done'  : self._done
+        }
+
+    def load_snapshot(self, snapshot):
+        """
+        Load a get_l3_order_book snapshot, rows are [orderId, price, size, ts].
+        The exchange does not sort them, rows are put in time priority by ts and the price
+        index is built once per side instead of per order."""
+
+        orders = self.orders
+        orders.clear()
+
+        price_key = self._price_key
+        size_key = self._size_key
+
+        for side, levels, rows in (('buy', self.bids, snapshot.get('bids') or []),
+                                   ('sell', self.asks, snapshot.get('asks') or [])):
+            levels.clear()
+            level_for = levels.level
+
+            if rows and len(rows[0]) > 3:
+                rows = sorted(rows, key=itemgetter(3))
+
+            for row in rows:
+                order_id = row[0]
+                price = price_key(row[1])
+                size = size_key(row[2])
+                level = level_for(price, False)
+
+                order = Order(order_id, side, price, size, row[3] if len(row) > 3 else None, level)
+                level.orders[order_id] = order
+                level.size += size
+                orders[order_id] = order
+
+            levels.reindex()
+
+    def add(self, order_id, side, price, size, ts=None):
+        price = self._price_key(price)
+        level = (self.bids if side == 'buy' else self.asks).level(price)
+
+        order = Order(order_id, side, price, self._size_key(size), ts, level)
+        level.orders[order_id] = order
+        level.size += order.size
+        self.orders[order_id] = order
+
+        return order
+
+    def remove(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+
+        level = order.level
+        del level.orders[order_id]
+        level.size -= order.size
+
+        if not level.orders:
+            (self.bids if order.side == 'buy' else self.asks).discard(level)
+
+        return order
+
+    def resize(self, order_id, size):
+        order = self.orders.get(order_id)
+        if order is None:
+            return None
+
+        size = self._size_key(size)
+        order.level.size += size - order.size
+        order.size = size
+
+        return order
+
+    def apply(self, kind, data):
+        """
+        Apply one level3 message body by its subject, received and unknown subjects are ignored."""
+
+        handler = self._handlers.get(kind)
+        if handler is not None:
+            handler(data)
+
+    def _open(self, data):
+        self.add(data['orderId'], data['side'], data['price'], data['size'], data.get('ts'))
+
+    def _update(self, data):
+        self.resize(data['orderId'], data['size'])
+
+    def _match(self, data):
+        self.resize(data['makerOrderId'], data['remainSize'])
+
+    def _done(self, data):
+        self.remove(data['orderId'])
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def queue_position(self, order_id):
+        """
+        Orders and total size resting ahead of order_id at its price, None if the order is not in the book."""
+
+        order = self.orders.get(order_id)
+        if order is None:
+            return None
+
+        ahead = 0
+        size_ahead = 0
+        for other in order.level.orders.values():
+            if other is order:
+                break
+
+            ahead += 1
+            size_ahead += other.size
+
+        return ahead, size_ahead
+
+
+class L3OrderBookSync(SequencedBookSync):
+    """
+    L3OrderBook kept in sync with the /contractMarket/level3v2 websocket topic.
+
+    Route that topic's messages to on_message and await start() once, gaps are recovered
+    from get_l3_messages or a fresh get_l3_order_book snapshot.
+
+    Param	    Type	    Description
+    market	    object	    MarketClient or AsyncMarketClient used for snapshots and gap fills
+    symbol	    String	    Symbol of the contract
+    max_gap	    int	        [optional] Widest gap filled from get_l3_messages before rebuilding. Default 500
+    on_update	callable	[optional] Called with this object after messages were applied
+    book	    L3OrderBook	[optional] Book to maintain, one is created by default"""
+
+    def __init__(self, market, symbol, max_gap=500, on_update=None, book=None):
+        super().__init__(max_gap, on_update)
+
+        self._market = market
+        self.symbol = symbol
+        self.book = book or L3OrderBook(symbol)
+
+    def _fetch_snapshot(self):
+        return self._market.get_l3_order_book(self.symbol)
+
+    def _fetch_messages(self, start, end):
+        return self._market.get_l3_messages(self.symbol, start, end)
+
+    def _load_snapshot(self, snapshot):
+        self.book.load_snapshot(snapshot)
+
+    @staticmethod
+    def _parse(msg):
+        # websocket pushes carry the message kind in subject, the REST message query in type
+        data = msg.get('data', msg)
+        return int(data['sequence']), (msg.get('subject') or data.get('type'), data)
+
+    def _apply(self, item):
+        self.book.apply(*item)
@@ -0,0 +1,195 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+import inspect
+
+
+async def _resolve(result):
+    if inspect.isawaitable(result):
+        return await result
+
+    return result
+
+
+class SequencedBookSync:
+    """
+    Keeps a local book consistent with a sequenced websocket feed.
+
+    The book is loaded from a REST snapshot while websocket deltas are buffered. Deltas are applied in
+    sequence order; when a gap shows up the missing range is pulled from the REST message endpoint, or
+    the book is rebuilt from a fresh snapshot when the gap is wider than max_gap.
+
+    A failed recovery is retried by the same task with exponential backoff from retry_delay up to
+    retry_max_delay seconds, messages arriving meanwhile are buffered.
+
+    Subclasses provide _fetch_snapshot, _fetch_messages, _load_snapshot, _apply and _parse."""
+
+    retry_delay = 0.5
+    retry_max_delay = 30
+
+    def __init__(self, max_gap=500, on_update=None):
+        self._max_gap = max_gap
+        self._on_update = on_update
+
+        self.sequence = None
+        self._buffer = {}
+        self._started = False
+        self._recovering = False
+        self._task = None
+
+        self.gaps = 0
+        self.resyncs = 0
+        self.last_error = None
+
+    @property
+    def ready(self):
+        return self.sequence is not None and not self._recovering
+
+    async def start(self):
+        """
+        Load the initial snapshot. Websocket messages may be fed before and while this runs."""
+
+        self._started = True
+        self._recovering = True
+
+        if not await self._recover(None):
+            raise self.last_error
+
+    async def stop(self):
+        self._started = False
+
+        if self._task is not None:
+            self._task.cancel()
+
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+    def on_message(self, msg):
+        """
+        Feed one decoded websocket message for this book's topic."""
+
+        sequence, item = self._parse(msg)
+
+        if self._recovering:
+            self._buffer[sequence] = item
+            return
+
+        if self.sequence is None:
+            self._buffer[sequence] = item
+
+            # start() failed, start over from a fresh snapshot
+            if self._started and self._task is None:
+                self._schedule(None)
+            return
+
+        expected = self.sequence + 1
+        if sequence < expected:
+            return
+
+        if sequence == expected:
+            self._apply(item)
+            self.sequence = sequence
+
+            if self._on_update is not None:
+                self._on_update(self)
+            return
+
+        self._buffer[sequence] = item
+        self.gaps += 1
+        self._schedule(expected)
+
+    def _schedule(self, gap_start):
+        self._recovering = True
+        self._task = asyncio.ensure_future(self._recover(gap_start, retry=True))
+
+    async def _recover(self, gap_start, retry=False):
+        delay = self.retry_delay
+
+        try:
+            while True:
+                try:
+                    await self._catch_up(gap_start)
+                    break
+                except Exception as e:
+                    self.sequence = None
+                    self.last_error = e
+
+                    if not retry or not self._started:
+                        return False
+
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.retry_max_delay)
+                gap_start = None
+        finally:
+            self._recovering = False
+            self._task = None
+
+        if self._on_update is not None:
+            self._on_update(self)
+
+        return True
+
+    async def _catch_up(self, gap_start):
+        previous = None
+
+        while True:
+            # resync when there is no book yet, the gap is too wide, or the last fill did not close it
+            if gap_start is None or gap_start == previous or min(self._buffer) - gap_start > self._max_gap:
+                await self._resync()
+            else:
+                messages = await _resolve(self._fetch_messages(gap_start, min(self._buffer) - 1))
+
+                for msg in messages or []:
+                    sequence, item = self._parse(msg)
+                    self._buffer.setdefault(sequence, item)
+
+            previous = gap_start
+            gap_start = self._drain()
+            if gap_start is None:
+                return
+
+            self.gaps += 1
+
+    async def _resync(self):
+        self.resyncs += 1
+
+        snapshot = await _resolve(self._fetch_snapshot())
+        self._load_snapshot(snapshot)
+        self.sequence = int(snapshot['sequence'])
+
+    def _drain(self):
+        # apply buffered messages in order, returns the first missing sequence or None when caught up
+        buffer = self._buffer
+
+        for sequence in sorted(buffer):
+            if sequence <= self.sequence:
+                del buffer[sequence]
+                continue
+
+            if sequence != self.sequence + 1:
+                return self.sequence + 1
+
+            self._apply(buffer.pop(sequence))
+            self.sequence = sequence
+
+        return None
+
@@ -0,0 +1,72 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class Codec:
+    """
+    JSON backend used by the REST and websocket clients. loads accepts str or bytes,
+    dumps returns str and raises ValueError subclasses on malformed input."""
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return f'Codec({self.name!r})'
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj).decode('utf-8')
+
+
+codecs = {
+    'json': Codec('json', json.loads, json.dumps)
+}
+
+if ujson is not None:
+    codecs['ujson'] = Codec('ujson', ujson.loads, ujson.dumps)
+
+if orjson is not None:
+    codecs['orjson'] = Codec('orjson', orjson.loads, _orjson_dumps)
+
+
+def get_codec(name=None):
+    """
+    Return the codec called `name`, or the fastest installed one: orjson, then ujson, then the stdlib."""
+
+    if name is not None:
+        return codecs[name]
+
+    for name in ('orjson', 'ujson', 'json'):
+        if name in codecs:
+            return codecs[name]
+
+
+default_codec = get_codec()
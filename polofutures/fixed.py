@@ -0,0 +1,215 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+from decimal import Decimal, InvalidOperation
+
+
+class Grid:
+    """
+    Exact conversion between decimal values and integer counts of a step such as a tick or lot size.
+
+    The step is held as num / 10**scale, so strings are converted with integer arithmetic only.
+    Values off the grid raise ValueError. Feed prices repeat a lot, so recent conversions are
+    memoized and a repeated price costs one dict lookup.
+
+    Param	Type	        Description
+    step	String/number	Step size, e.g. tickSize of a contract"""
+
+    __slots__ = ('step', 'scale', 'num', '_pow', '_memo')
+
+    memo_size = 65536
+
+    def __init__(self, step):
+        try:
+            step_value = Decimal(str(step))
+        except InvalidOperation:
+            raise ValueError(f'Step must be a decimal number, got {step!r}') from None
+
+        if not step_value.is_finite():
+            raise ValueError(f'Step must be positive, got {step!r}')
+
+        sign, digits, exponent = step_value.normalize().as_tuple()
+        if sign or not any(digits):
+            raise ValueError(f'Step must be positive, got {step!r}')
+
+        num = int(''.join(map(str, digits)))
+        if exponent > 0:
+            num *= 10 ** exponent
+            exponent = 0
+
+        self.step = step
+        self.scale = -exponent
+        self.num = num
+        self._pow = 10 ** self.scale
+        self._memo = {}
+
+    def to_units(self, value):
+        """
+        Count of steps in value, a wire string, int or float."""
+
+        memo = self._memo
+        units = memo.get(value)
+        if units is not None:
+            return units
+
+        if isinstance(value, str):
+            scaled = self._parse(value)
+        elif isinstance(value, int):
+            scaled = value * self._pow
+        else:
+            # floats (e.g. snapshot levels) are snapped to the nearest representable decimal
+            scaled = round(value * self._pow)
+
+        units, remainder = divmod(scaled, self.num)
+        if remainder:
+            raise ValueError(f'{value!r} is not a multiple of {self.step}')
+
+        if len(memo) >= self.memo_size:
+            memo.clear()
+        memo[value] = units
+
+        return units
+
+    def _parse(self, value):
+        digits = value[1:] if value.startswith('-') else value
+        whole, _, fraction = digits.partition('.')
+
+        if not (whole + fraction).isdigit():
+            # exponents, signs and whitespace take the slow path
+            try:
+                scaled = Decimal(value).scaleb(self.scale)
+            except InvalidOperation:
+                raise ValueError(f'{value!r} is not a decimal number') from None
+
+            if not scaled.is_finite():
+                raise ValueError(f'{value!r} is not a decimal number')
+            if scaled != scaled.to_integral_value():
+                raise ValueError(f'{value!r} is not a multiple of {self.step}')
+            return int(scaled)
+
+        scale = self.scale
+        if len(fraction) > scale:
+            if fraction[scale:].strip('0'):
+                raise ValueError(f'{value!r} is not a multiple of {self.step}')
+            fraction = fraction[:scale]
+
+        scaled = int(whole or '0') * self._pow + int(fraction.ljust(scale, '0') or '0')
+
+        return -scaled if digits is not value else scaled
+
+    def to_string(self, units):
+        """
+        Exact decimal string of units steps."""
+
+        scaled = units * self.num
+        if not self.scale:
+            return str(scaled)
+
+        sign = '-' if scaled < 0 else ''
+        whole, fraction = divmod(abs(scaled), self._pow)
+
+        return f'{sign}{whole}.{fraction:0{self.scale}d}'
+
+
+class ContractSpec:
+    """
+    Fixed-point view of one contract: prices as integer tick counts and sizes as integer lot counts.
+
+    to_ticks and to_lots fit L2OrderBook's price_key and size_key, so a book keyed on ints is
+    L2OrderBook(symbol, price_key=spec.to_ticks, size_key=spec.to_lots). limit_order converts back
+    exactly when placing orders.
+
+    Param	    Type	        Description
+    symbol	    String	        Symbol of the contract
+    tick_size	String/number	Price increment
+    lot_size	String/number	[optional] Size increment in contracts. Default 1
+    multiplier	String/number	[optional] Contract multiplier. Default 1"""
+
+    __slots__ = ('symbol', 'tick_size', 'lot_size', 'multiplier', 'ticks', 'lots', 'tick_value')
+
+    def __init__(self, symbol, tick_size, lot_size=1, multiplier=1):
+        self.symbol = symbol
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        self.multiplier = multiplier
+
+        self.ticks = Grid(tick_size)
+        self.lots = Grid(lot_size)
+
+        # value in quote currency of one tick times one lot
+        self.tick_value = float(Decimal(str(tick_size)) * Decimal(str(lot_size)) * Decimal(str(multiplier)))
+
+    @classmethod
+    def from_contract(cls, contract):
+        """
+        Spec from one item of MarketClient.get_contracts_list or get_contract_detail."""
+
+        return cls(contract['symbol'], contract['tickSize'], contract.get('lotSize') or 1,
+                   contract.get('multiplier') or 1)
+
+    @classmethod
+    def load_all(cls, contracts):
+        """
+        symbol -> spec for the result of MarketClient.get_contracts_list."""
+
+        return {contract['symbol']: cls.from_contract(contract) for contract in contracts}
+
+    def to_ticks(self, price):
+        return self.ticks.to_units(price)
+
+    def to_lots(self, size):
+        return self.lots.to_units(size)
+
+    def price(self, ticks):
+        """
+        Exact price string of ticks."""
+
+        return self.ticks.to_string(ticks)
+
+    def size(self, lots):
+        """
+        Size in contracts of lots, an int when the lot size is whole."""
+
+        size = self.lots.to_string(lots)
+        return int(size) if not self.lots.scale else size
+
+    def notional(self, ticks, lots):
+        """
+        Value in quote currency of lots at a price of ticks."""
+
+        return ticks * lots * self.tick_value
+
+    def limit_order(self, side, leverage, ticks, lots, **kwargs):
+        """
+        create_limit_order arguments for an order of lots at ticks, e.g.
+        trade.create_limit_order(**spec.limit_order('buy', '10', ticks, lots)).
+        The dicts also suit TradeClient.create_limit_orders."""
+
+        order = {
+            'symbol'  : self.symbol,
+            'side'    : side,
+            'leverage': leverage,
+            'size'    : self.size(lots),
+            'price'   : self.price(ticks)
+        }
+        order.update(kwargs)
+
+        return order
+
+    def __repr__(self):
+        return (f'ContractSpec({self.symbol!r}, tick_size={self.tick_size!r}, lot_size={self.lot_size!r}, '
+                f'multiplier={self.multiplier!r})')
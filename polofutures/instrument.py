@@ -0,0 +1,261 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import logging
+import threading
+import time
+from collections import Counter
+
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of integer microseconds in the spirit of HdrHistogram: every power of two
+    is split into 16 sub-buckets, so recorded values keep about 6% precision at any magnitude and
+    record() is a couple of integer ops and one dict update."""
+
+    __slots__ = ('_counts', 'count', 'total', 'min', 'max')
+
+    _sub_bits = 4
+    _sub_count = 1 << _sub_bits
+
+    def __init__(self):
+        self._counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        value = int(value)
+        if value < 0:
+            value = 0
+
+        if value < self._sub_count:
+            index = value
+        else:
+            shift = value.bit_length() - self._sub_bits - 1
+            index = ((shift + 1) << self._sub_bits) + (value >> shift) - self._sub_count
+
+        counts = self._counts
+        counts[index] = counts.get(index, 0) + 1
+
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @classmethod
+    def _lower_bound(cls, index):
+        if index < cls._sub_count:
+            return index
+
+        shift = (index >> cls._sub_bits) - 1
+        return ((index & (cls._sub_count - 1)) + cls._sub_count) << shift
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+
+        rank = max(1, int(self.count * percent / 100 + 0.5))
+        seen = 0
+
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                # report the middle of the bucket, clamped to what was actually seen
+                value = (self._lower_bound(index) + self._lower_bound(index + 1) - 1) // 2
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'min'  : self.min,
+            'max'  : self.max,
+            'mean' : self.total / self.count if self.count else None,
+            'p50'  : self.percentile(50),
+            'p90'  : self.percentile(90),
+            'p99'  : self.percentile(99),
+            'p999' : self.percentile(99.9)
+        }
+
+
+class _EndpointStats:
+    __slots__ = ('latency', 'calls', 'errors', 'bytes_sent', 'bytes_received')
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.errors = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def snapshot(self):
+        return {
+            'calls'         : self.calls,
+            'errors'        : dict(self.errors),
+            'bytes_sent'    : self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'latency_us'    : self.latency.snapshot()
+        }
+
+
+def endpoint_name(method, path):
+    """
+    Collapse a request path to its endpoint, replacing symbols and order ids by '*'."""
+
+    path = path.split('?', 1)[0]
+    segments = [
+        '*' if segment.isupper() or (len(segment) > 12 and any(c.isdigit() for c in segment)) else segment
+        for segment in path.split('/')
+    ]
+
+    return method + ' ' + '/'.join(segments)
+
+
+class RequestProbe:
+    """
+    Measures one REST call, created by Instrumentation.start."""
+
+    __slots__ = ('_instrumentation', 'method', 'path', 'bytes_sent', 'status', 'bytes_received', 'error', '_start')
+
+    def __init__(self, instrumentation, method, path, bytes_sent):
+        self._instrumentation = instrumentation
+        self.method = method
+        self.path = path
+        self.bytes_sent = bytes_sent
+        self.status = None
+        self.bytes_received = 0
+        self.error = None
+        self._start = time.perf_counter()
+
+    def received(self, status, bytes_received):
+        self.status = status
+        self.bytes_received = bytes_received
+
+    def finish(self):
+        self._instrumentation._finish(self, time.perf_counter() - self._start)
+
+
+class Instrumentation:
+    """
+    Counters, latency histograms and hooks for SendRequest and WsClient.
+
+    Pre hooks are called as hook(method, path) before a REST call is sent, post hooks as
+    hook(method, path, status, seconds, error) once it completed or failed. A hook that raises is
+    logged and skipped, it never fails or masks the error of the call itself. snapshot() returns
+    everything as plain dicts and ints.
+
+    Param	    Type	Description
+    pre_hooks	list	[optional] Callables run before each REST call
+    post_hooks	list	[optional] Callables run after each REST call"""
+
+    def __init__(self, pre_hooks=None, post_hooks=None):
+        self.pre_hooks = list(pre_hooks or [])
+        self.post_hooks = list(post_hooks or [])
+
+        self._endpoints = {}
+        self._retries = Counter()
+        self._lock = threading.Lock()
+
+        self._ws = Counter()
+        self._ws_handler = LatencyHistogram()
+        self._ws_reconnect = LatencyHistogram()
+        self._ws_rtt = LatencyHistogram()
+
+    def start(self, method, path, body):
+        for hook in self.pre_hooks:
+            self._call_hook(hook, method, path)
+
+        return RequestProbe(self, method, path, len(body) if body else 0)
+
+    def _finish(self, probe, elapsed):
+        name = endpoint_name(probe.method, probe.path)
+        error = probe.error
+
+        # batch calls finish REST probes from several threads at once
+        with self._lock:
+            stats = self._endpoints.get(name)
+            if stats is None:
+                stats = self._endpoints[name] = _EndpointStats()
+
+            stats.calls += 1
+            stats.latency.record(elapsed * 1e6)
+            stats.bytes_sent += probe.bytes_sent
+            stats.bytes_received += probe.bytes_received
+
+            if error is not None:
+                code = getattr(error, 'code', None) or probe.status
+                if code is None or code == 200:
+                    code = type(error).__name__
+                stats.errors[str(code)] += 1
+
+        for hook in self.post_hooks:
+            self._call_hook(hook, probe.method, probe.path, probe.status, elapsed, error)
+
+    def _call_hook(self, hook, *args):
+        # post hooks run from a finally clause, an exception here would replace the real one
+        try:
+            hook(*args)
+        except Exception:
+            logger.exception('instrumentation hook %r failed', hook)
+
+    def record_retry(self, name):
+        with self._lock:
+            self._retries[name] += 1
+
+    def record_ws_frame(self, size):
+        self._ws['frames'] += 1
+        self._ws['bytes_received'] += size
+
+    def record_ws_send(self, size):
+        self._ws['frames_sent'] += 1
+        self._ws['bytes_sent'] += size
+
+    def record_ws_error(self, kind):
+        self._ws[kind] += 1
+
+    def record_ws_handler(self, elapsed):
+        self._ws_handler.record(elapsed * 1e6)
+
+    def record_ws_reconnect(self, elapsed):
+        self._ws['reconnects'] += 1
+        self._ws_reconnect.record(elapsed * 1e6)
+
+    def record_ws_rtt(self, elapsed):
+        self._ws_rtt.record(elapsed * 1e6)
+
+    def snapshot(self):
+        ws = dict(self._ws)
+        ws['handler_us'] = self._ws_handler.snapshot()
+        ws['reconnect_us'] = self._ws_reconnect.snapshot()
+        ws['rtt_us'] = self._ws_rtt.snapshot()
+
+        with self._lock:
+            rest = {name: stats.snapshot() for name, stats in self._endpoints.items()}
+
+        return {
+            'rest'   : rest,
+            'retries': dict(self._retries),
+            'ws'     : ws
+        }
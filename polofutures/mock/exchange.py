@@ -0,0 +1,749 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+import json
+import random
+import threading
+import time
+from uuid import uuid4
+
+from aiohttp import web, WSMsgType
+
+from polofutures.mock.market import SyntheticMarket, default_contracts
+
+
+trade_history_keys = ('sequence', 'tradeId', 'takerOrderId', 'makerOrderId', 'price', 'size', 'side', 'ts')
+
+feed_subjects = {
+    '/contractMarket/level2'   : 'level2',
+    '/contractMarket/execution': 'match',
+    '/contractMarket/ticker'   : 'ticker'
+}
+
+
+def _ok(data):
+    return web.json_response({'code': '200000', 'data': data})
+
+
+def _error(code, msg, status=200):
+    return web.json_response({'code': code, 'msg': msg}, status=status)
+
+
+class UnknownContract(Exception):
+    pass
+
+
+def _private(handler):
+    # signatures are not checked, only that the request was signed at all
+    async def signed(request):
+        if 'PF-API-KEY' not in request.headers or 'PF-API-SIGN' not in request.headers:
+            return _error('400001', 'Please check the header of your request for PF-API-KEY', 401)
+
+        return await handler(request)
+
+    return signed
+
+
+def _page(items, request):
+    current = int(request.query.get('currentPage', 1))
+    size = int(request.query.get('pageSize', 50))
+
+    return {
+        'currentPage': current,
+        'pageSize'   : size,
+        'totalNum'   : len(items),
+        'totalPage'  : (len(items) + size - 1) // size,
+        'items'      : items[(current - 1) * size:current * size]
+    }
+
+
+def _flag(request, name, default=True):
+    value = request.query.get(name)
+    if value is None:
+        return default
+
+    return value.lower() not in ('false', '0')
+
+
+def _series(request, interval, record, offset_key='timePoint', history=1000):
+    """
+    Time series endpoints: one record(point) every interval ms up to now, the last history of them
+    available. startAt / endAt bound the points, reverse (default true) serves newest first and
+    offset, the offset_key of the last record of a page, continues after it. offset_key is the
+    point itself for timePoint and point // interval otherwise."""
+
+    query = request.query
+    count = int(query.get('maxCount', 10))
+    reverse = _flag(request, 'reverse')
+
+    now = int(time.time() * 1000)
+    last = min(int(query.get('endAt', now)), now) // interval * interval
+    first = last - (history - 1) * interval
+    if 'startAt' in query:
+        first = max(first, -(-int(query['startAt']) // interval) * interval)
+
+    scale = 1 if offset_key == 'timePoint' else interval
+    offset = query.get('offset')
+
+    if reverse:
+        top = last if offset is None else min(last, int(offset) * scale - interval)
+        points = range(top, max(first, top - (count - 1) * interval) - 1, -interval)
+        has_more = bool(points) and points[-1] - interval >= first
+    else:
+        bottom = first if offset is None else max(first, int(offset) * scale + interval)
+        points = range(bottom, min(last, bottom + (count - 1) * interval) + 1, interval)
+        has_more = bool(points) and points[-1] + interval <= last
+
+    items = []
+    for point in points:
+        item = record(point)
+        item[offset_key] = point // scale
+        items.append(item)
+
+    return {'dataList': items, 'hasMore': has_more}
+
+
+class MockExchange:
+    """
+    Local stand-in for the futures exchange, for tests and load runs without network access.
+
+    Serves the REST endpoints used by MarketClient, TradeClient and UserClient, the bullet token
+    endpoints and the websocket protocol (welcome, subscribe / unsubscribe acks, ping / pong).
+    Subscribed level2, execution and ticker topics are pushed at feed_rates messages per second per
+    symbol from a SyntheticMarket, whose level2 and level3 snapshot and message endpoints stay
+    consistent with the pushed sequence. Every REST call waits latency seconds plus up to jitter seconds, and
+    fails with error_code at rate error_rate. latency, jitter and error_rate may be changed while
+    running.
+
+    Use `async with MockExchange() as exchange` inside a running loop, or `with MockExchange()` to
+    serve from a background thread for the blocking RestClient. base_url is passed to the clients.
+
+    Param	        Type	Description
+    host	        String	[optional] Bind address. Default 127.0.0.1
+    port	        int	    [optional] Port, 0 picks a free one
+    contracts	    dict	[optional] symbol -> price, tickSize, lotSize, multiplier
+    latency	        float	[optional] Seconds added to every REST call
+    jitter	        float	[optional] Max random seconds added on top of latency
+    error_rate	    float	[optional] Share of REST calls answered with an error, 0 to 1
+    error_code	    String	[optional] Code of injected errors. Default 500000
+    error_status	int	    [optional] HTTP status of injected errors. Default 500
+    feed_rates	    dict	[optional] Topic prefix -> messages per second per symbol
+    ping_interval	int	    [optional] pingInterval announced with the bullet token, ms
+    ping_timeout	int	    [optional] pingTimeout announced with the bullet token, ms
+    seed	        int	    [optional] Seed for repeatable books and feeds"""
+
+    start_timeout = 10
+
+    def __init__(self, host='127.0.0.1', port=0, contracts=None, latency=0, jitter=0, error_rate=0,
+                 error_code='500000', error_status=500, feed_rates=None, ping_interval=18000, ping_timeout=10000,
+                 seed=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.error_status = error_status
+        self.feed_rates = {'/contractMarket/level2': 50, '/contractMarket/execution': 10, '/contractMarket/ticker': 5}
+        self.feed_rates.update(feed_rates or {})
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+
+        self._rng = random.Random(seed)
+        self.markets = {
+            symbol: SyntheticMarket(symbol, spec['price'], spec['tickSize'], spec.get('lotSize', 1),
+                                    spec.get('multiplier', 1), rng=random.Random(self._rng.random()))
+            for symbol, spec in (contracts or default_contracts).items()
+        }
+
+        self.orders = {}
+
+        # topic -> set of websockets
+        self._subscribers = {}
+        self._feeds = {}
+        self._sockets = set()
+
+        self._runner = None
+        self._thread = None
+        self._loop = None
+
+        self.requests = 0
+        self.errors = 0
+        self.frames_sent = 0
+
+    @property
+    def base_url(self):
+        return f'http://{self.host}:{self.port}'
+
+    def _app(self):
+        app = web.Application(middlewares=[self._inject])
+        add = app.router.add_route
+
+        add('GET', '/api/v1/timestamp', self._timestamp)
+        add('POST', '/api/v1/bullet-public', self._bullet)
+        add('POST', '/api/v1/bullet-private', _private(self._bullet))
+        add('GET', '/endpoint', self._websocket)
+
+        add('GET', '/api/v1/interest/query', self._interest)
+        add('GET', '/api/v1/index/query', self._index)
+        add('GET', '/api/v1/premium/query', self._premium)
+        add('GET', '/api/v1/mark-price/{symbol}/current', self._mark_price)
+        add('GET', '/api/v1/funding-rate/{symbol}/current', self._funding_rate)
+        add('GET', '/api/v1/trade/history', self._trade_history)
+        add('GET', '/api/v1/level2/snapshot', self._l2_snapshot)
+        add('GET', '/api/v1/level2/message/query', self._l2_messages)
+        add('GET', '/api/v1/level3/snapshot', self._l3_snapshot)
+        add('GET', '/api/v1/level3/message/query', self._l3_messages)
+        add('GET', '/api/v1/ticker', self._ticker)
+        add('GET', '/api/v1/contracts/active', self._contracts)
+        add('GET', '/api/v1/contracts/{symbol}', self._contract)
+
+        add('GET', '/api/v1/funding-history', _private(self._funding_history))
+        add('GET', '/api/v1/position', _private(self._position))
+        add('GET', '/api/v1/positions', _private(self._positions))
+        add('POST', '/api/v1/position/margin/auto-deposit-status', _private(self._true))
+        add('POST', '/api/v1/position/margin/deposit-margin', _private(self._deposit_margin))
+        add('GET', '/api/v1/fills', _private(self._fills))
+        add('GET', '/api/v1/recentFills', _private(self._recent_fills))
+        add('GET', '/api/v1/openOrderStatistics', _private(self._order_statistics))
+        add('POST', '/api/v1/orders', _private(self._create_order))
+        add('DELETE', '/api/v1/orders', _private(self._cancel_all))
+        add('DELETE', '/api/v1/orders/{order_id}', _private(self._cancel_order))
+        add('GET', '/api/v1/orders', _private(self._order_list))
+        add('GET', '/api/v1/orders/{order_id}', _private(self._order_details))
+        add('DELETE', '/api/v1/stopOrders', _private(self._cancel_stop_orders))
+        add('GET', '/api/v1/stopOrders', _private(self._stop_orders))
+        add('GET', '/api/v1/recentDoneOrders', _private(self._recent_done_orders))
+
+        add('GET', '/api/v1/account-overview', _private(self._account_overview))
+        add('GET', '/api/v1/transaction-history', _private(self._transaction_history))
+
+        add('*', '/{path:.*}', self._not_found)
+
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self._app(), handle_signals=False)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, self.host, self.port)
+        try:
+            await site.start()
+        except Exception:
+            await self._runner.cleanup()
+            self._runner = None
+            raise
+
+        self.port = self._runner.addresses[0][1]
+
+        return self.base_url
+
+    async def stop(self):
+        for task in self._feeds.values():
+            task.cancel()
+        self._feeds.clear()
+
+        for ws in list(self._sockets):
+            await ws.close()
+
+        await self._runner.cleanup()
+        self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def __enter__(self):
+        started = threading.Event()
+        failure = []
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.start())
+            except BaseException as e:
+                failure.append(e)
+                self._loop.close()
+                return
+            finally:
+                started.set()
+
+            self._loop.run_forever()
+
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+
+        if not started.wait(self.start_timeout):
+            raise TimeoutError(f'MockExchange did not start within {self.start_timeout}s')
+
+        if failure:
+            self._thread.join()
+            self._thread = None
+            raise failure[0]
+
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    async def drop_connections(self):
+        """
+        Close every websocket from the server side, e.g. to exercise reconnects."""
+
+        for ws in list(self._sockets):
+            await ws.close()
+
+    async def publish(self, topic, frames):
+        """
+        Send frames (str, or dicts to be JSON encoded) to every websocket subscribed to topic, e.g.
+        recorded or pre-built messages. Returns the number of frames sent."""
+
+        sent = 0
+
+        for ws in list(self._subscribers.get(topic, ())):
+            for frame in frames:
+                if ws.closed:
+                    break
+
+                await ws.send_str(frame if isinstance(frame, str) else json.dumps(frame))
+                sent += 1
+
+        self.frames_sent += sent
+
+        return sent
+
+    def stats(self):
+        return {
+            'requests'   : self.requests,
+            'errors'     : self.errors,
+            'connections': len(self._sockets),
+            'frames_sent': self.frames_sent,
+            'topics'     : {topic: len(sockets) for topic, sockets in self._subscribers.items() if sockets}
+        }
+
+    @web.middleware
+    async def _inject(self, request, handler):
+        if request.path == '/endpoint':
+            return await handler(request)
+
+        self.requests += 1
+
+        delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return _error(self.error_code, 'Injected error', self.error_status)
+
+        try:
+            return await handler(request)
+        except UnknownContract as e:
+            return _error('100001', f'Contract {e.args[0]} not exist')
+
+    def _market(self, request, symbol=None):
+        symbol = symbol or request.match_info.get('symbol') or request.query.get('symbol')
+        market = self.markets.get(symbol)
+
+        if market is None:
+            raise UnknownContract(symbol)
+
+        return market
+
+    async def _body(self, request):
+        if not request.can_read_body:
+            return {}
+
+        return await request.json()
+
+    async def _not_found(self, request):
+        return _error('404000', 'Url Not Found', 404)
+
+    async def _timestamp(self, request):
+        return _ok(int(time.time() * 1000))
+
+    async def _bullet(self, request):
+        return _ok({
+            'token'          : uuid4().hex,
+            'instanceServers': [{
+                'endpoint'    : f'ws://{self.host}:{self.port}/endpoint',
+                'protocol'    : 'websocket',
+                'encrypt'     : False,
+                'pingInterval': self.ping_interval,
+                'pingTimeout' : self.ping_timeout
+            }]
+        })
+
+    # market data
+
+    async def _interest(self, request):
+        symbol = request.query.get('symbol')
+
+        return _ok(_series(request, 60000, lambda point: {'symbol': symbol, 'granularity': 60000, 'timePoint': point,
+                                                          'value': 0.0003}))
+
+    async def _index(self, request):
+        market = self._market(request)
+        price = float(market.price(market.best_bid()))
+
+        return _ok(_series(request, 60000, lambda point: {
+            'symbol'         : market.symbol,
+            'granularity'    : 60000,
+            'timePoint'      : point,
+            'value'          : price,
+            'decomposionList': [{'exchange': 'mock', 'price': price, 'weight': 1.0}]
+        }))
+
+    async def _premium(self, request):
+        symbol = request.query.get('symbol')
+
+        return _ok(_series(request, 60000, lambda point: {'symbol': symbol, 'granularity': 60000, 'timePoint': point,
+                                                          'value': 0.0001}))
+
+    async def _mark_price(self, request):
+        market = self._market(request)
+        price = float(market.price(market.best_bid()))
+
+        return _ok({'symbol': market.symbol, 'granularity': 1000, 'timePoint': int(time.time() * 1000),
+                    'value': price, 'indexPrice': price})
+
+    async def _funding_rate(self, request):
+        market = self._market(request)
+        point = int(time.time() * 1000) // 28800000 * 28800000
+
+        return _ok({'symbol': f'.{market.symbol}FPI8H', 'granularity': 28800000, 'timePoint': point,
+                    'value': 0.0001, 'predictedValue': 0.0001})
+
+    async def _trade_history(self, request):
+        market = self._market(request)
+
+        # the REST history carries neither symbol nor matchSize, unlike the execution push
+        return _ok([{key: trade[key] for key in trade_history_keys} for trade in list(market.trades)[-100:][::-1]])
+
+    async def _l2_snapshot(self, request):
+        return _ok(self._market(request).snapshot())
+
+    async def _l2_messages(self, request):
+        market = self._market(request)
+        start = int(request.query.get('start', 0))
+        end = int(request.query.get('end', market.sequence))
+
+        return _ok(market.messages(start, end))
+
+    async def _l3_snapshot(self, request):
+        return _ok(self._market(request).l3_snapshot())
+
+    async def _l3_messages(self, request):
+        market = self._market(request)
+        start = int(request.query.get('start', 0))
+        end = int(request.query.get('end', market.sequence))
+
+        return _ok(market.l3_messages(start, end))
+
+    async def _ticker(self, request):
+        return _ok(self._market(request).ticker())
+
+    async def _contracts(self, request):
+        return _ok([market.contract() for market in self.markets.values()])
+
+    async def _contract(self, request):
+        return _ok(self._market(request).contract())
+
+    # trading, positions and account
+
+    async def _funding_history(self, request):
+        market = self._market(request)
+        price = float(market.price(market.best_bid()))
+
+        return _ok(_series(request, 28800000, lambda point: {
+            'symbol'        : market.symbol,
+            'timePoint'     : point,
+            'fundingRate'   : 0.0001,
+            'markPrice'     : price,
+            'positionQty'   : 0,
+            'positionCost'  : 0,
+            'funding'       : 0,
+            'settleCurrency': 'USDT'
+        }, 'id'))
+
+    async def _transaction_history(self, request):
+        currency = request.query.get('currency', 'USDT')
+
+        return _ok(_series(request, 28800000, lambda point: {
+            'time'         : point,
+            'type'         : 'RealisedPNL',
+            'amount'       : 0,
+            'fee'          : 0,
+            'accountEquity': 10000,
+            'status'       : 'Completed',
+            'remark'       : 'mock',
+            'currency'     : currency
+        }, 'offset'))
+
+    def _position_of(self, market):
+        return {
+            'id'              : market.symbol,
+            'symbol'          : market.symbol,
+            'autoDeposit'     : False,
+            'realLeverage'    : 0,
+            'crossMode'       : False,
+            'currentQty'      : 0,
+            'currentCost'     : 0,
+            'markPrice'       : float(market.price(market.best_bid())),
+            'isOpen'          : False,
+            'settleCurrency'  : 'USDT'
+        }
+
+    async def _position(self, request):
+        return _ok(self._position_of(self._market(request)))
+
+    async def _positions(self, request):
+        return _ok([self._position_of(market) for market in self.markets.values()])
+
+    async def _true(self, request):
+        return _ok(True)
+
+    async def _deposit_margin(self, request):
+        body = await self._body(request)
+
+        return _ok(self._position_of(self._market(request, body.get('symbol'))))
+
+    async def _fills(self, request):
+        return _ok(_page([], request))
+
+    async def _recent_fills(self, request):
+        return _ok([])
+
+    async def _order_statistics(self, request):
+        symbol = self._market(request).symbol
+        active = [order for order in self.orders.values() if order['symbol'] == symbol and order['isActive']]
+
+        return _ok({
+            'openOrderBuySize' : sum(order['size'] for order in active if order['side'] == 'buy'),
+            'openOrderSellSize': sum(order['size'] for order in active if order['side'] == 'sell'),
+            'openOrderBuyCost' : '0',
+            'openOrderSellCost': '0',
+            'settleCurrency'   : 'USDT'
+        })
+
+    async def _create_order(self, request):
+        body = await self._body(request)
+        market = self._market(request, body.get('symbol'))
+
+        if body.get('side') not in ('buy', 'sell'):
+            return _error('400100', 'side is invalid')
+
+        order_type = body.get('type', 'limit')
+        if order_type == 'limit' and ('price' not in body or 'size' not in body):
+            return _error('400100', 'price and size are required for limit orders')
+
+        order_id = uuid4().hex[:24]
+        now = int(time.time() * 1000)
+
+        self.orders[order_id] = {
+            'id'           : order_id,
+            'symbol'       : market.symbol,
+            'type'         : order_type,
+            'side'         : body['side'],
+            'price'        : str(body.get('price', '')),
+            'size'         : int(body.get('size', 0)),
+            'dealSize'     : 0,
+            'leverage'     : str(body.get('leverage', '')),
+            'clientOid'    : body.get('clientOid'),
+            'status'       : 'open',
+            'isActive'     : True,
+            'cancelExist'  : False,
+            'createdAt'    : now,
+            'updatedAt'    : now,
+            'settleCurrency': 'USDT'
+        }
+
+        return _ok({'orderId': order_id})
+
+    def _cancel(self, order):
+        order['status'] = 'done'
+        order['isActive'] = False
+        order['cancelExist'] = True
+        order['updatedAt'] = int(time.time() * 1000)
+
+    async def _cancel_order(self, request):
+        order = self.orders.get(request.match_info['order_id'])
+        if order is None or not order['isActive']:
+            return _error('100004', 'The order cannot be canceled.')
+
+        self._cancel(order)
+
+        return _ok({'cancelledOrderIds': [order['id']]})
+
+    async def _cancel_all(self, request):
+        symbol = request.query.get('symbol')
+
+        cancelled = []
+        for order in self.orders.values():
+            if order['isActive'] and (symbol is None or order['symbol'] == symbol):
+                self._cancel(order)
+                cancelled.append(order['id'])
+
+        return _ok({'cancelledOrderIds': cancelled})
+
+    async def _cancel_stop_orders(self, request):
+        return _ok({'cancelledOrderIds': []})
+
+    async def _order_list(self, request):
+        query = request.query
+        active = query.get('status', 'done') == 'active'
+
+        orders = [order for order in self.orders.values()
+                  if order['isActive'] == active
+                  and query.get('symbol', order['symbol']) == order['symbol']
+                  and query.get('side', order['side']) == order['side']]
+        orders.sort(key=lambda order: order['createdAt'], reverse=True)
+
+        return _ok(_page(orders, request))
+
+    async def _order_details(self, request):
+        order = self.orders.get(request.match_info['order_id'])
+        if order is None:
+            return _error('100001', 'order not exist')
+
+        return _ok(order)
+
+    async def _stop_orders(self, request):
+        return _ok(_page([], request))
+
+    async def _recent_done_orders(self, request):
+        return _ok([order for order in self.orders.values() if not order['isActive']][-1000:])
+
+    async def _account_overview(self, request):
+        return _ok({
+            'accountEquity'   : 10000.0,
+            'unrealisedPNL'   : 0.0,
+            'marginBalance'   : 10000.0,
+            'positionMargin'  : 0.0,
+            'orderMargin'     : 0.0,
+            'frozenFunds'     : 0.0,
+            'availableBalance': 10000.0,
+            'currency'        : request.query.get('currency', 'USDT')
+        })
+
+    # websocket
+
+    async def _websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        self._sockets.add(ws)
+        topics = set()
+
+        try:
+            await ws.send_json({'id': request.query.get('connectId', uuid4().hex), 'type': 'welcome'})
+
+            async for frame in ws:
+                if frame.type != WSMsgType.TEXT:
+                    continue
+
+                try:
+                    msg = json.loads(frame.data)
+                except ValueError:
+                    continue
+
+                kind = msg.get('type')
+
+                if kind == 'ping':
+                    await ws.send_json({'id': msg.get('id'), 'type': 'pong'})
+                elif kind in ('subscribe', 'unsubscribe'):
+                    await self._on_subscription(ws, msg, topics)
+        finally:
+            self._sockets.discard(ws)
+
+            for topic in topics:
+                self._subscribers.get(topic, set()).discard(ws)
+
+        return ws
+
+    async def _on_subscription(self, ws, msg, topics):
+        prefix, _, symbols = (msg.get('topic') or '').partition(':')
+
+        if prefix not in self.feed_rates and prefix not in feed_subjects or not symbols:
+            if msg.get('response'):
+                await ws.send_json({'id': msg.get('id'), 'type': 'error', 'code': 404,
+                                    'data': f'topic {msg.get("topic")} is not found'})
+            return
+
+        for symbol in symbols.split(','):
+            topic = f'{prefix}:{symbol}'
+
+            if msg['type'] == 'subscribe':
+                topics.add(topic)
+                self._subscribers.setdefault(topic, set()).add(ws)
+
+                if topic not in self._feeds and symbol in self.markets and self.feed_rates.get(prefix):
+                    self._feeds[topic] = asyncio.ensure_future(self._feed(prefix, symbol))
+            else:
+                topics.discard(topic)
+                self._subscribers.get(topic, set()).discard(ws)
+
+        if msg.get('response'):
+            await ws.send_json({'id': msg.get('id'), 'type': 'ack'})
+
+    async def _feed(self, prefix, symbol):
+        topic = f'{prefix}:{symbol}'
+        subject = feed_subjects.get(prefix, prefix.rsplit('/', 1)[-1])
+        market = self.markets[symbol]
+
+        if prefix == '/contractMarket/level2':
+            step = market.step_level2
+        elif prefix == '/contractMarket/execution':
+            step = market.step_execution
+        else:
+            step = market.ticker
+
+        rate = self.feed_rates[prefix]
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        sent = 0
+
+        try:
+            while self._subscribers.get(topic):
+                subscribers = self._subscribers[topic]
+
+                # catch up on whatever is due so the rate holds when the loop runs late,
+                # a backlog of more than a second is dropped
+                expected = int((loop.time() - start) * rate)
+                due = min(expected - sent, max(int(rate), 1))
+                sent = expected
+
+                for _ in range(due):
+                    frame = json.dumps({'type': 'message', 'topic': topic, 'subject': subject, 'data': step()})
+
+                    for ws in list(subscribers):
+                        if not ws.closed:
+                            await ws.send_str(frame)
+                            self.frames_sent += 1
+
+                await asyncio.sleep(max(1 / rate, 0.001))
+        finally:
+            self._feeds.pop(topic, None)
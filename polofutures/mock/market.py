@@ -0,0 +1,231 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import random
+import time
+from collections import deque
+from decimal import Decimal
+from uuid import uuid4
+
+
+default_contracts = {
+    'BTCUSDTPERP': {'price': 30000, 'tickSize': 1, 'lotSize': 1, 'multiplier': 0.001},
+    'ETHUSDTPERP': {'price': 2000, 'tickSize': 0.05, 'lotSize': 1, 'multiplier': 0.01}
+}
+
+
+class SyntheticMarket:
+    """
+    Random-walk order book and trade tape of one contract, kept consistent between the
+    REST snapshot / message endpoints and the pushed level2, execution and ticker feeds.
+
+    Every price level is one resting order, so the level3 snapshot and messages describe the
+    same book and share the level2 sequence.
+
+    Param	    Type	Description
+    symbol	    String	Contract symbol
+    price	    float	Starting mid price
+    tick_size	float	Price increment
+    lot_size	int	    [optional] Size increment. Default 1
+    multiplier	float	[optional] Contract multiplier. Default 1
+    depth	    int	    [optional] Price levels per side. Default 50
+    history	    int	    [optional] Level2 / level3 changes and trades kept for the REST queries. Default 10000
+    rng	        Random	[optional] Random source, pass a seeded one for repeatable feeds"""
+
+    def __init__(self, symbol, price, tick_size, lot_size=1, multiplier=1, depth=50, history=10000, rng=None):
+        self.symbol = symbol
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        self.multiplier = multiplier
+        self.depth = depth
+
+        self._rng = rng or random.Random()
+        self._decimals = max(0, -Decimal(str(tick_size)).as_tuple().exponent)
+
+        # prices are held in ticks
+        mid = int(round(price / tick_size))
+        self.bids = {mid - i: self._size() for i in range(1, depth + 1)}
+        self.asks = {mid + i: self._size() for i in range(1, depth + 1)}
+        self.sequence = 1
+
+        # (side, ticks) -> (orderId, ts) of the order resting at each level
+        now = time.time_ns()
+        self.orders = {(side, price): (uuid4().hex[:24], now)
+                       for side, levels in (('buy', self.bids), ('sell', self.asks)) for price in levels}
+
+        self.changes = deque(maxlen=history)
+        self.l3_changes = deque(maxlen=history)
+        self.trades = deque(maxlen=history)
+        self.trade_sequence = 1
+
+    def _size(self):
+        return self._rng.randint(1, 500) * self.lot_size
+
+    def price(self, ticks):
+        return f'{ticks * self.tick_size:.{self._decimals}f}'
+
+    def best_bid(self):
+        return max(self.bids)
+
+    def best_ask(self):
+        return min(self.asks)
+
+    def contract(self):
+        mark = self.price((self.best_bid() + self.best_ask()) // 2)
+
+        return {
+            'symbol'            : self.symbol,
+            'rootSymbol'        : 'USDT',
+            'type'              : 'FFWCSX',
+            'baseCurrency'      : self.symbol[:-8] if self.symbol.endswith('USDTPERP') else self.symbol,
+            'quoteCurrency'     : 'USDT',
+            'settleCurrency'    : 'USDT',
+            'maxOrderQty'       : 1000000,
+            'maxPrice'          : 1000000.0,
+            'lotSize'           : self.lot_size,
+            'tickSize'          : self.tick_size,
+            'indexPriceTickSize': self.tick_size,
+            'multiplier'        : self.multiplier,
+            'initialMargin'     : 0.01,
+            'maintainMarginRate': 0.005,
+            'maxLeverage'       : 100,
+            'isInverse'         : False,
+            'markPrice'         : float(mark),
+            'indexPrice'        : float(mark),
+            'lastTradePrice'    : float(mark),
+            'fundingFeeRate'    : 0.0001,
+            'status'            : 'Open'
+        }
+
+    def snapshot(self):
+        return {
+            'symbol'  : self.symbol,
+            'sequence': self.sequence,
+            'bids'    : [[float(self.price(price)), self.bids[price]] for price in sorted(self.bids, reverse=True)],
+            'asks'    : [[float(self.price(price)), self.asks[price]] for price in sorted(self.asks)]
+        }
+
+    def messages(self, start, end):
+        return [change for change in self.changes if start <= change['sequence'] <= end]
+
+    def l3_snapshot(self):
+        rows = {'buy': [], 'sell': []}
+        for (side, price), (order_id, ts) in self.orders.items():
+            levels = self.bids if side == 'buy' else self.asks
+            rows[side].append([order_id, float(self.price(price)), levels[price], ts])
+
+        return {'symbol': self.symbol, 'sequence': self.sequence, 'bids': rows['buy'], 'asks': rows['sell']}
+
+    def l3_messages(self, start, end):
+        return [change for change in self.l3_changes if start <= change['sequence'] <= end]
+
+    def step_level2(self):
+        """
+        Move the book by one level change and return the level2 push data."""
+
+        rng = self._rng
+
+        # quotes stay strictly inside the opposite touch, so the book never crosses and
+        # drifts as touch levels are pulled
+        side = rng.choice(('buy', 'sell'))
+        if side == 'buy':
+            levels = self.bids
+            price = self.best_ask() - rng.randint(1, self.depth)
+        else:
+            levels = self.asks
+            price = self.best_bid() + rng.randint(1, self.depth)
+
+        resting = price in levels
+        size = 0 if resting and len(levels) > 1 and rng.random() < 0.3 else self._size()
+        if size:
+            levels[price] = size
+        else:
+            del levels[price]
+
+        self.sequence += 1
+        self._step_level3(side, price, size, resting)
+
+        data = {
+            'sequence' : self.sequence,
+            'change'   : f'{self.price(price)},{side},{size}',
+            'timestamp': int(time.time() * 1000)
+        }
+        self.changes.append(dict(data, symbol=self.symbol))
+
+        return data
+
+    def _step_level3(self, side, price, size, resting):
+        ts = time.time_ns()
+        data = {'symbol': self.symbol, 'sequence': self.sequence, 'side': side, 'ts': ts}
+
+        if not resting:
+            order_id = uuid4().hex[:24]
+            self.orders[side, price] = (order_id, ts)
+            data.update(type='open', orderId=order_id, price=self.price(price), size=size)
+        elif size:
+            data.update(type='update', orderId=self.orders[side, price][0], size=size)
+        else:
+            data.update(type='done', orderId=self.orders.pop((side, price))[0], reason='canceled')
+
+        self.l3_changes.append(data)
+
+    def step_execution(self):
+        """
+        Print a trade at the touch and return the execution push data."""
+
+        rng = self._rng
+
+        side = rng.choice(('buy', 'sell'))
+        price = self.best_ask() if side == 'buy' else self.best_bid()
+        size = rng.randint(1, 50) * self.lot_size
+
+        self.trade_sequence += 1
+
+        data = {
+            'symbol'      : self.symbol,
+            'sequence'    : self.trade_sequence,
+            'side'        : side,
+            'matchSize'   : size,
+            'size'        : size,
+            'price'       : self.price(price),
+            'takerOrderId': uuid4().hex[:24],
+            'makerOrderId': uuid4().hex[:24],
+            'tradeId'     : uuid4().hex[:24],
+            'ts'          : time.time_ns()
+        }
+        self.trades.append(data)
+
+        return data
+
+    def ticker(self):
+        bid = self.best_bid()
+        ask = self.best_ask()
+        last = self.trades[-1] if self.trades else None
+
+        return {
+            'symbol'      : self.symbol,
+            'sequence'    : self.trade_sequence,
+            'side'        : last['side'] if last else 'buy',
+            'price'       : last['price'] if last else self.price(bid),
+            'size'        : last['size'] if last else 0,
+            'tradeId'     : last['tradeId'] if last else '',
+            'bestBidSize' : self.bids.get(bid, 0),
+            'bestBidPrice': self.price(bid),
+            'bestAskPrice': self.price(ask),
+            'bestAskSize' : self.asks.get(ask, 0),
+            'ts'          : time.time_ns()
+        }
@@ -0,0 +1,358 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+_missing = object()
+
+
+class _Lazy:
+    """
+    Descriptor decoding a value on first read and caching it in a slot of the instance."""
+
+    __slots__ = ('name', 'load', 'slot')
+
+    def __init__(self, load):
+        self.load = load
+        self.name = None
+        self.slot = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+
+        try:
+            return self.slot.__get__(obj, owner)
+        except AttributeError:
+            value = self.load(obj)
+            self.slot.__set__(obj, value)
+            return value
+
+
+class _Field(_Lazy):
+    """
+    Descriptor over the wire slots of keys. Values with a parse function are decoded once and
+    cached, plain ones are read straight from the wire slot."""
+
+    __slots__ = ('keys', 'parse', 'wire')
+
+    def __init__(self, keys, parse):
+        super().__init__(self._read)
+        self.keys = keys
+        self.parse = parse
+        self.wire = ()
+
+    def _read(self, obj):
+        value = None
+        for name in self.wire:
+            value = getattr(obj, name, None)
+            if value is not None:
+                break
+
+        if self.parse is None:
+            return value
+
+        return self.parse(value) if value is not None and value != '' else None
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+
+        if self.slot is None:
+            return self._read(obj)
+
+        return super().__get__(obj, owner)
+
+
+def field(key, parse=None):
+    """
+    Model attribute read from the payload. key may be a tuple of alternative keys, parse
+    converts the value, a missing or empty value reads as None."""
+
+    return _Field(key if isinstance(key, tuple) else (key,), parse)
+
+
+def lazy(func):
+    """
+    Model attribute computed by func(model) on first read."""
+
+    return _Lazy(func)
+
+
+def _init_source(wire):
+    # one straight-line assignment per wire key, a loop over slot descriptors costs several times more
+    lines = ['def __init__(self, raw):', '    get = raw.get', '    found = 0']
+    for key, name in wire.items():
+        lines += [f'    value = get({key!r}, _missing)',
+                  '    if value is not _missing:',
+                  f'        self.{name} = value',
+                  '        found += 1']
+    lines.append('    self._extra = {key: value for key, value in raw.items() if key not in wire} '
+                 'if found < len(raw) else None')
+
+    return '\n'.join(lines)
+
+
+class _ModelType(type):
+    # every payload key a field reads gets a wire slot, every decoded attribute a cache slot
+    def __new__(mcs, name, bases, namespace):
+        attributes = [key for key, value in namespace.items() if isinstance(value, _Lazy)]
+        cached = [key for key in attributes
+                  if not isinstance(namespace[key], _Field) or namespace[key].parse is not None]
+
+        inherited = {}
+        for base in reversed(bases):
+            inherited.update(getattr(base, '_wire', {}))
+
+        wire = dict(inherited)
+        for key in attributes:
+            if isinstance(namespace[key], _Field):
+                wire.update((key, f'_w_{key}') for key in namespace[key].keys if key not in wire)
+
+        namespace['__slots__'] = (tuple(namespace.get('__slots__', ())) + tuple(f'_{key}' for key in cached) +
+                                  tuple(name for key, name in wire.items() if key not in inherited))
+
+        if wire:
+            scope = {'_missing': _missing, 'wire': wire}
+            exec(_init_source(wire), scope)
+            namespace['__init__'] = scope['__init__']
+
+        cls = super().__new__(mcs, name, bases, namespace)
+
+        cls._wire = wire
+        cls._fields = tuple(getattr(cls, '_fields', ())) + tuple(attributes)
+
+        for key in attributes:
+            descriptor = namespace[key]
+            if key in cached:
+                descriptor.slot = cls.__dict__[f'_{key}']
+            if isinstance(descriptor, _Field):
+                descriptor.wire = tuple(wire[key] for key in descriptor.keys)
+
+        return cls
+
+
+class Model(metaclass=_ModelType):
+    """
+    Read-only record over a payload dict. The values of the keys its fields read are kept in slots
+    and the dict itself is not, any other key is held in a small overflow dict only when present.
+    Attributes are decoded on first access and cached, item access and get() return the wire
+    values, so code written against plain dicts keeps working."""
+
+    __slots__ = ('_extra',)
+
+    def __init__(self, raw):
+        self._extra = dict(raw)
+
+    @property
+    def raw(self):
+        """
+        The payload rebuilt as a plain dict."""
+
+        return dict(self.items())
+
+    def get(self, key, default=None):
+        name = self._wire.get(key)
+        if name is None:
+            extra = self._extra
+            return default if extra is None else extra.get(key, default)
+
+        return getattr(self, name, default)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._wire[key])
+        except KeyError:
+            if self._extra is None:
+                raise
+            return self._extra[key]
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def keys(self):
+        keys = [key for key, name in self._wire.items() if hasattr(self, name)]
+        if self._extra is not None:
+            keys.extend(self._extra)
+
+        return keys
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self):
+        """
+        All attributes, decoded."""
+
+        return {name: getattr(self, name) for name in self._fields}
+
+    @classmethod
+    def from_list(cls, items):
+        return [cls(item) for item in items or ()]
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.raw!r})'
+
+
+class Ticker(Model):
+    """
+    Ticker, from MarketClient.get_ticker or the /contractMarket/ticker feed."""
+
+    symbol = field('symbol')
+    sequence = field('sequence', int)
+    side = field('side')
+    price = field('price', float)
+    size = field('size', int)
+    trade_id = field('tradeId')
+    best_bid_price = field('bestBidPrice', float)
+    best_bid_size = field('bestBidSize', int)
+    best_ask_price = field('bestAskPrice', float)
+    best_ask_size = field('bestAskSize', int)
+    ts = field('ts', int)
+
+
+class Level2Change(Model):
+    """
+    One level2 update. The "price,side,size" change string is split only once price, side or size
+    is read."""
+
+    sequence = field('sequence', int)
+    timestamp = field('timestamp', int)
+    change = field('change')
+
+    parts = lazy(lambda self: self.change.split(','))
+    price = lazy(lambda self: float(self.parts[0]))
+    side = lazy(lambda self: self.parts[1])
+    size = lazy(lambda self: int(self.parts[2]))
+
+
+class Execution(Model):
+    """
+    Trade from the /contractMarket/execution feed or MarketClient.get_trade_history."""
+
+    symbol = field('symbol')
+    sequence = field('sequence', int)
+    side = field('side')
+    price = field('price', float)
+    size = field('size', int)
+    match_size = field('matchSize', int)
+    trade_id = field('tradeId')
+    taker_order_id = field('takerOrderId')
+    maker_order_id = field('makerOrderId')
+    ts = field('ts', int)
+
+
+class Order(Model):
+    """
+    Order from the TradeClient order queries or the private orderChange feed."""
+
+    id = field(('id', 'orderId'))
+    symbol = field('symbol')
+    type = field(('type', 'orderType'))
+    side = field('side')
+    price = field('price', float)
+    size = field('size', int)
+    deal_size = field(('dealSize', 'filledSize'), int)
+    status = field('status')
+    client_oid = field('clientOid')
+    leverage = field('leverage', float)
+    is_active = field('isActive')
+    created_at = field(('createdAt', 'orderTime'), int)
+    updated_at = field(('updatedAt', 'ts'), int)
+
+
+class Fill(Model):
+    """
+    Fill from TradeClient.get_fills_details or get_recent_fills."""
+
+    symbol = field('symbol')
+    trade_id = field('tradeId')
+    order_id = field('orderId')
+    side = field('side')
+    liquidity = field('liquidity')
+    price = field('price', float)
+    size = field('size', int)
+    value = field('value', float)
+    fee = field('fee', float)
+    fee_currency = field('feeCurrency')
+    trade_time = field('tradeTime', int)
+    created_at = field('createdAt', int)
+
+
+class Position(Model):
+    """
+    Position from TradeClient.get_position_details / get_all_position or the position.change feed."""
+
+    id = field('id')
+    symbol = field('symbol')
+    current_qty = field('currentQty', int)
+    current_cost = field('currentCost', float)
+    avg_entry_price = field('avgEntryPrice', float)
+    mark_price = field('markPrice', float)
+    liquidation_price = field('liquidationPrice', float)
+    real_leverage = field('realLeverage', float)
+    realised_pnl = field('realisedPnl', float)
+    unrealised_pnl = field('unrealisedPnl', float)
+    maint_margin = field('maintMargin', float)
+    is_open = field('isOpen')
+    settle_currency = field('settleCurrency')
+
+
+class AccountOverview(Model):
+    """
+    Balances from UserClient.get_account_overview."""
+
+    account_equity = field('accountEquity', float)
+    unrealised_pnl = field('unrealisedPNL', float)
+    margin_balance = field('marginBalance', float)
+    position_margin = field('positionMargin', float)
+    order_margin = field('orderMargin', float)
+    frozen_funds = field('frozenFunds', float)
+    available_balance = field('availableBalance', float)
+    currency = field('currency')
+
+
+# websocket subject -> model of its data
+subject_models = {
+    'level2'           : Level2Change,
+    'match'            : Execution,
+    'ticker'           : Ticker,
+    'orderChange'      : Order,
+    'symbolOrderChange': Order,
+    'position.change'  : Position
+}
+
+
+def wrap_message(msg):
+    """
+    Replace the data of a websocket message with its model, when its subject has one."""
+
+    model = subject_models.get(msg.get('subject'))
+
+    if model is not None and isinstance(msg.get('data'), dict):
+        msg['data'] = model(msg['data'])
+
+    return msg
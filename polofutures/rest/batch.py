@@ -0,0 +1,63 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+BatchResult = namedtuple('BatchResult', ['id', 'result', 'error'])
+BatchResult.__doc__ = """
+Outcome of one item of a batch call. id is the clientOid of a placed order or the orderId of a cancel,
+exactly one of result and error is set."""
+
+
+def run_batch(calls, concurrency=8):
+    """
+    Run (id, callable) pairs with at most `concurrency` in flight, results in input order."""
+
+    def run(call):
+        item_id, func = call
+
+        try:
+            return BatchResult(item_id, func(), None)
+        except Exception as e:
+            return BatchResult(item_id, None, e)
+
+    if not calls:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(calls))) as executor:
+        return list(executor.map(run, calls))
+
+
+async def arun_batch(calls, concurrency=8):
+    """
+    Coroutine version of run_batch, each callable must return an awaitable."""
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(call):
+        item_id, func = call
+
+        async with semaphore:
+            try:
+                return BatchResult(item_id, await func(), None)
+            except Exception as e:
+                return BatchResult(item_id, None, e)
+
+    return list(await asyncio.gather(*[run(call) for call in calls]))
@@ -0,0 +1,226 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+default_ttls = {
+    'get_contracts_list' : 60,
+    'get_contract_detail': 60
+}
+
+
+class TTLCache:
+    """
+    LRU mapping whose entries expire `ttl` seconds after they were stored."""
+
+    def __init__(self, ttl, maxsize=128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def lookup(self, key, now, stale=False):
+        """
+        Return (value, fresh), or (None, None) when the key is not cached. An expired entry is
+        returned as (value, False) when stale is set and counts as a miss otherwise."""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, None
+
+        value, expires = entry
+        if now < expires:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, True
+
+        if not stale:
+            self.misses += 1
+            return None, None
+
+        self._entries.move_to_end(key)
+        self.stale_hits += 1
+        return value, False
+
+    def store(self, key, value, now):
+        self._entries[key] = (value, now + self.ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    In-process cache for slow changing REST responses, one TTL/LRU table per client method.
+
+    Param	                Type	Description
+    ttls	                dict	[optional] method name -> seconds to live, merged over default_ttls
+    maxsize	                int	    [optional] Max entries kept per method. Default 128
+    stale_while_revalidate	bool	[optional] Serve expired entries right away and refresh them in the background
+    copy_on_read	        bool	[optional] Hand out a deep copy on every hit instead of the cached object
+
+    Responses are deep copied once when stored. Hits return the cached object itself, which callers
+    must treat as read-only unless copy_on_read is set."""
+
+    def __init__(self, ttls=None, maxsize=128, stale_while_revalidate=False, copy_on_read=False):
+        config = dict(default_ttls)
+        config.update(ttls or {})
+
+        self._tables = {name: TTLCache(ttl, maxsize) for name, ttl in config.items()}
+        self._stale_while_revalidate = stale_while_revalidate
+        self._copy_on_read = copy_on_read
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+
+    def __contains__(self, name):
+        return name in self._tables
+
+    def get(self, name, key, load):
+        """
+        Return the cached response for (name, key), calling load() on a miss."""
+
+        table = self._tables[name]
+
+        with self._lock:
+            value, fresh = table.lookup(key, time.monotonic(), self._stale_while_revalidate)
+            refresh = self._should_refresh(name, key, fresh)
+
+        if fresh:
+            return self._read(value)
+
+        if fresh is False:
+            if refresh:
+                threading.Thread(target=self._refresh, args=(table, name, key, load), daemon=True).start()
+            return self._read(value)
+
+        value = load()
+
+        with self._lock:
+            table.store(key, copy.deepcopy(value), time.monotonic())
+
+        return value
+
+    async def aget(self, name, key, load):
+        """
+        Coroutine version of get, load() must return an awaitable."""
+
+        table = self._tables[name]
+
+        with self._lock:
+            value, fresh = table.lookup(key, time.monotonic(), self._stale_while_revalidate)
+            refresh = self._should_refresh(name, key, fresh)
+
+        if fresh:
+            return self._read(value)
+
+        if fresh is False:
+            if refresh:
+                # the loop only keeps weak references to tasks, hold on to it until it finishes
+                task = asyncio.ensure_future(self._arefresh(table, name, key, load))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return self._read(value)
+
+        value = await load()
+
+        with self._lock:
+            table.store(key, copy.deepcopy(value), time.monotonic())
+
+        return value
+
+    def _read(self, value):
+        return copy.deepcopy(value) if self._copy_on_read else value
+
+    def _should_refresh(self, name, key, fresh):
+        # an expired entry is served stale while exactly one refresh for it is in flight
+        if fresh is not False:
+            return False
+
+        if (name, key) in self._refreshing:
+            return False
+
+        self._refreshing.add((name, key))
+        return True
+
+    def _refresh(self, table, name, key, load):
+        try:
+            value = load()
+        except Exception:
+            return
+        else:
+            with self._lock:
+                table.store(key, copy.deepcopy(value), time.monotonic())
+        finally:
+            with self._lock:
+                self._refreshing.discard((name, key))
+
+    async def _arefresh(self, table, name, key, load):
+        try:
+            value = await load()
+        except Exception:
+            return
+        else:
+            with self._lock:
+                table.store(key, copy.deepcopy(value), time.monotonic())
+        finally:
+            with self._lock:
+                self._refreshing.discard((name, key))
+
+    def invalidate(self, name=None, key=None):
+        """
+        Drop one entry, every entry of one method, or everything when called without arguments."""
+
+        with self._lock:
+            if name is None:
+                for table in self._tables.values():
+                    table.invalidate()
+            else:
+                self._tables[name].invalidate(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'hits'      : table.hits,
+                    'stale_hits': table.stale_hits,
+                    'misses'    : table.misses,
+                    'size'      : len(table)
+                }
+                for name, table in self._tables.items()
+            }
@@ -15,16 +15,67 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE
 
-from polofutures.rest.market import MarketClient
-from polofutures.rest.trade import TradeClient
-from polofutures.rest.user import UserClient
+from polofutures.rest.clock import ClockOffsetEstimator
+from polofutures.rest.core import SendRequest, AsyncSendRequest
+from polofutures.rest.market import MarketClient, AsyncMarketClient
+from polofutures.rest.pool import ConnectionPool
+from polofutures.rest.trade import TradeClient, AsyncTradeClient
+from polofutures.rest.user import UserClient, AsyncUserClient
 
 
 class RestClient:
-    def __init__(self, key=None, secret=None, passphrase=None, base_url=None):
-        self._user_client = UserClient(key, secret, passphrase, base_url)
-        self._trade_client = TradeClient(key, secret, passphrase, base_url)
-        self._market_client = MarketClient(key, secret, passphrase, base_url)
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, pool_size=10, pool_idle_timeout=30,
+                 rate_limiter=None, cache=None, sync_clock=False, instrumentation=None):
+        self._pool = ConnectionPool(pool_size, pool_idle_timeout)
+
+        self._clock = None
+        if sync_clock:
+            self._clock = ClockOffsetEstimator(SendRequest(base_url=base_url, pool=self._pool))
+            self._clock.start()
+
+        self._request = SendRequest(key, secret, passphrase, base_url, pool=self._pool, rate_limiter=rate_limiter,
+                                    clock=self._clock, instrumentation=instrumentation)
+
+        self._user_client = UserClient(request=self._request)
+        self._trade_client = TradeClient(request=self._request)
+        self._market_client = MarketClient(request=self._request, cache=cache)
+
+    def user_api(self):
+        return self._user_client
+
+    def trade_api(self):
+        return self._trade_client
+
+    def market_api(self):
+        return self._market_client
+
+    def clock(self):
+        return self._clock
+
+    def close(self):
+        if self._clock is not None:
+            self._clock.stop()
+
+        self._pool.close()
+
+
+class AsyncRestClient:
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, pool_size=10, pool_idle_timeout=30,
+                 rate_limiter=None, cache=None, sync_clock=False, instrumentation=None):
+        # the clock is sampled every few seconds from its own thread, off the event loop
+        self._clock = None
+        if sync_clock:
+            self._clock_pool = ConnectionPool(1)
+            self._clock = ClockOffsetEstimator(SendRequest(base_url=base_url, pool=self._clock_pool))
+            self._clock.start()
+
+        self._request = AsyncSendRequest(key, secret, passphrase, base_url, pool_size=pool_size,
+                                         pool_idle_timeout=pool_idle_timeout, rate_limiter=rate_limiter,
+                                         clock=self._clock, instrumentation=instrumentation)
+
+        self._user_client = AsyncUserClient(request=self._request)
+        self._trade_client = AsyncTradeClient(request=self._request)
+        self._market_client = AsyncMarketClient(request=self._request, cache=cache)
 
     def user_api(self):
         return self._user_client
@@ -34,3 +85,13 @@ class RestClient:
 
     def market_api(self):
         return self._market_client
+
+    def clock(self):
+        return self._clock
+
+    async def close(self):
+        if self._clock is not None:
+            self._clock.stop()
+            self._clock_pool.close()
+
+        await self._request.close()
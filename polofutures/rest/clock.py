@@ -0,0 +1,128 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import threading
+import time
+from collections import deque
+
+
+class ClockOffsetEstimator:
+    """
+    Tracks the offset between the local clock and the exchange clock from /api/v1/timestamp.
+
+    Each sample brackets the server timestamp between the local send and receive times and assumes
+    a symmetric path, as NTP does. Of the last `window` samples the one with the lowest round trip
+    is trusted most, and the offset is an exponential moving average of those best samples.
+
+    Param	    Type	    Description
+    request	    callable	A SendRequest used to poll the server time
+    interval	float	    [optional] Seconds between samples. Default 30
+    window	    int	        [optional] Number of recent samples the min-RTT filter picks from. Default 8
+    smoothing	float	    [optional] Weight of a new filtered sample in the moving average. Default 0.2"""
+
+    def __init__(self, request, interval=30, window=8, smoothing=0.2):
+        self._request = request
+        self._interval = interval
+        self._smoothing = smoothing
+
+        self._samples = deque(maxlen=window)
+        self._offset = 0.0
+        self._rtt = None
+        self._count = 0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def offset(self):
+        """
+        Seconds to add to the local clock to get the server clock."""
+        return self._offset
+
+    @property
+    def rtt(self):
+        """
+        Round trip time in seconds of the sample currently trusted, None before the first sample."""
+        return self._rtt
+
+    def now_ms(self):
+        """
+        Current server time estimate in milliseconds."""
+        return int((time.time() + self._offset) * 1000)
+
+    def add_sample(self, sent, server, received):
+        """
+        Feed one measurement: local send time, server time and local receive time, all in seconds."""
+
+        rtt = received - sent
+        offset = server - (sent + received) / 2
+
+        with self._lock:
+            self._samples.append((rtt, offset))
+            best_rtt, best_offset = min(self._samples)
+
+            if self._count == 0:
+                self._offset = best_offset
+            else:
+                self._offset += self._smoothing * (best_offset - self._offset)
+
+            self._rtt = best_rtt
+            self._count += 1
+
+    def sample(self):
+        sent = time.time()
+        server = self._request('GET', '/api/v1/timestamp')
+        received = time.time()
+
+        self.add_sample(sent, server / 1000, received)
+
+    def start(self):
+        """
+        Take a first sample right away and keep sampling from a background thread."""
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                pass
+
+            self._stop.wait(self._interval)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'offset_ms': self._offset * 1000,
+                'rtt_ms'   : self._rtt * 1000 if self._rtt is not None else None,
+                'samples'  : self._count
+            }
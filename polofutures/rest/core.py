@@ -15,69 +15,197 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE
 
-import json
 import requests
+import aiohttp
 import hmac
 import hashlib
 import base64
 import time
-from urllib.parse import urljoin
+from urllib.parse import urlsplit
+
+from polofutures.codec import default_codec
 
 
 _default_base_url = 'https://futures-api.poloniex.com'
 
 
+class ApiError(RuntimeError):
+    """
+    Raised when the exchange answers with a code other than 200000. The full payload is kept in args[0]."""
+
+    def __init__(self, payload, status=None):
+        super().__init__(payload)
+
+        self.payload = payload
+        self.status = status
+        self.code = payload.get('code') if isinstance(payload, dict) else None
+        self.msg = payload.get('msg') if isinstance(payload, dict) else None
+
+
 class SendRequest:
-    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, timeout=5):
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, timeout=5, pool=None, rate_limiter=None,
+                 clock=None, codec=None, instrumentation=None):
         self._key = key
         self._secret = secret.encode('utf-8') if secret else None
         self._passphrase = passphrase
 
         self._base_url = base_url or _default_base_url
         self._timeout = timeout
+        self._pool = pool
+        self._rate_limiter = rate_limiter
+        self._clock = clock
+        self._codec = codec or default_codec
+        self._instrumentation = instrumentation
 
-    def __call__(self, method, path, params=None, auth=False):
-        body = None
+        # request paths are always absolute, so only the origin of base_url is kept
+        parts = urlsplit(self._base_url)
+        self._origin = f'{parts.scheme}://{parts.netloc}'
 
-        if params:
-            if method in ['GET', 'DELETE']:
-                params = [f'{key}={value}' for key, value in params.items()]
-                params = '&'.join(params)
-                path += '?' + params
-            else:
-                body = json.dumps(params)
+        # the key schedule is derived once, each request signs on a copy of it
+        self._hmac = hmac.new(self._secret, digestmod=hashlib.sha256) if self._secret else None
 
-        headers = {
+        self._headers = {
             'Content-Type': 'application/json'
         }
+        self._auth_headers = {
+            'Content-Type'     : 'application/json',
+            'PF-API-KEY'       : self._key,
+            'PF-API-PASSPHRASE': self._passphrase
+        }
 
-        if auth:
-            now = int(time.time()) * 1000
-            str_to_sign = str(now) + method + path + (body or '')
-            signature = hmac.new(self._secret, str_to_sign.encode('utf-8'), hashlib.sha256)
-            signature = signature.digest()
-            signature = base64.b64encode(signature)
+    def __call__(self, method, path, params=None, auth=False):
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire(method, path, auth)
 
-            headers.update({
-                'PF-API-SIGN'      : signature,
-                'PF-API-TIMESTAMP' : str(now),
-                'PF-API-KEY'       : self._key,
-                'PF-API-PASSPHRASE': self._passphrase
-            })
+        url, headers, body = self._prepare(method, path, params, auth)
 
-        url = urljoin(self._base_url, path)
+        if self._instrumentation is None:
+            return self._send(method, url, headers, body, None)
 
-        response = requests.request(method, url, headers=headers, timeout=self._timeout, data=body)
+        probe = self._instrumentation.start(method, path, body)
+        try:
+            return self._send(method, url, headers, body, probe)
+        except Exception as e:
+            probe.error = e
+            raise
+        finally:
+            probe.finish()
+
+    def _send(self, method, url, headers, body, probe):
+        if self._pool is not None:
+            response = self._pool.request(method, url, headers=headers, timeout=self._timeout, data=body)
+        else:
+            response = requests.request(method, url, headers=headers, timeout=self._timeout, data=body)
+
+        if probe is not None:
+            probe.received(response.status_code, len(response.content))
 
         try:
-            payload = response.json()
+            payload = self._codec.loads(response.content)
         except:
             if response.status_code != 200:
                 response.raise_for_status()
 
             raise RuntimeError(response.text)
 
+        return self._unwrap(payload, response.status_code)
+
+    def _prepare(self, method, path, params, auth):
+        body = None
+
+        if params:
+            if method == 'GET' or method == 'DELETE':
+                path += '?' + '&'.join([f'{key}={value}' for key, value in params.items()])
+            else:
+                body = self._codec.dumps(params)
+
+        url = self._origin + path
+
+        if not auth:
+            return url, self._headers, body
+
+        if self._clock is not None:
+            now = str(self._clock.now_ms())
+        else:
+            now = str(int(time.time() * 1000))
+
+        signature = self._hmac.copy()
+        signature.update((now + method + path + (body or '')).encode('utf-8'))
+
+        headers = self._auth_headers.copy()
+        headers['PF-API-SIGN'] = base64.b64encode(signature.digest()).decode('ascii')
+        headers['PF-API-TIMESTAMP'] = now
+
+        return url, headers, body
+
+    @staticmethod
+    def _unwrap(payload, status=None):
         if payload['code'] == '200000':
             return payload.get('data', None)
 
-        raise RuntimeError(payload)
+        raise ApiError(payload, status)
+
+
+class AsyncSendRequest(SendRequest):
+    """
+    asyncio flavour of SendRequest. Calls return coroutines and share one aiohttp
+    session, created on first use inside the running event loop."""
+
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, timeout=5,
+                 pool_size=10, pool_idle_timeout=30, rate_limiter=None, clock=None, codec=None,
+                 instrumentation=None):
+        super().__init__(key, secret, passphrase, base_url, timeout, rate_limiter=rate_limiter, clock=clock,
+                         codec=codec, instrumentation=instrumentation)
+
+        self._pool_size = pool_size
+        self._pool_idle_timeout = pool_idle_timeout
+        self._session = None
+
+    async def __call__(self, method, path, params=None, auth=False):
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire_async(method, path, auth)
+
+        url, headers, body = self._prepare(method, path, params, auth)
+
+        if self._instrumentation is None:
+            return await self._send(method, url, headers, body, None)
+
+        probe = self._instrumentation.start(method, path, body)
+        try:
+            return await self._send(method, url, headers, body, probe)
+        except Exception as e:
+            probe.error = e
+            raise
+        finally:
+            probe.finish()
+
+    async def _send(self, method, url, headers, body, probe):
+        session = self._session
+        if session is None or session.closed:
+            session = self._session = self._create_session()
+
+        async with session.request(method, url, headers=headers, data=body) as response:
+            content = await response.read()
+
+            if probe is not None:
+                probe.received(response.status, len(content))
+
+            try:
+                payload = self._codec.loads(content)
+            except ValueError:
+                response.raise_for_status()
+
+                raise RuntimeError(content.decode('utf-8', 'replace'))
+
+        return self._unwrap(payload, response.status)
+
+    def _create_session(self):
+        connector = aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=self._pool_idle_timeout)
+        timeout = aiohttp.ClientTimeout(total=self._timeout)
+
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -15,12 +15,30 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE
 
-from polofutures.rest.core import SendRequest
+from polofutures.fixed import ContractSpec
+from polofutures.rest.core import SendRequest, AsyncSendRequest
+from polofutures.rest.paginate import iterate, aiterate
 
 
 class MarketClient:
-    def __init__(self, key=None, secret=None, passphrase=None, base_url=None):
-        self._request = SendRequest(key, secret, passphrase, base_url)
+    _iterate = staticmethod(iterate)
+
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, request=None, cache=None):
+        self._request = request or SendRequest(key, secret, passphrase, base_url)
+        self._cache = cache
+
+    def _cached(self, name, key, load):
+        if self._cache is None or name not in self._cache:
+            return load()
+
+        return self._cache.get(name, key, load)
+
+    def invalidate_cache(self, name=None, key=None):
+        """
+        Drop cached responses, see ResponseCache.invalidate."""
+
+        if self._cache is not None:
+            self._cache.invalidate(name, key)
 
     def get_server_timestamp(self):
         """
@@ -47,6 +65,19 @@ class MarketClient:
 
         return self._request('GET', '/api/v1/interest/query', params)
 
+    def iter_interest_rate(self, symbol, window=None, parallelism=4, **kwargs):
+        """
+        Iterate the interest rate list across all pages, takes the same params as get_interest_rate.
+
+        Param	    Type	Description
+        window	    long	[optional] Split the startAt/endAt range into windows of this many miliseconds, fetched concurrently
+        parallelism	int	    [optional] Max number of windows fetched at once. Default 4"""
+
+        def fetch(**params):
+            return self.get_interest_rate(symbol, **params)
+
+        return self._iterate(fetch, kwargs, 'timePoint', window, parallelism)
+
     def get_index_list(self, symbol, **kwargs):
         """
         Check index list
@@ -67,6 +98,19 @@ class MarketClient:
 
         return self._request('GET', '/api/v1/index/query', params)
 
+    def iter_index_list(self, symbol, window=None, parallelism=4, **kwargs):
+        """
+        Iterate the index list across all pages, takes the same params as get_index_list.
+
+        Param	    Type	Description
+        window	    long	[optional] Split the startAt/endAt range into windows of this many miliseconds, fetched concurrently
+        parallelism	int	    [optional] Max number of windows fetched at once. Default 4"""
+
+        def fetch(**params):
+            return self.get_index_list(symbol, **params)
+
+        return self._iterate(fetch, kwargs, 'timePoint', window, parallelism)
+
     def get_current_mark_price(self, symbol):
         """
         Check the current mark price.
@@ -95,6 +139,19 @@ class MarketClient:
 
         return self._request('GET', '/api/v1/premium/query', params)
 
+    def iter_premium_index(self, symbol, window=None, parallelism=4, **kwargs):
+        """
+        Iterate the premium index across all pages, takes the same params as get_premium_index.
+
+        Param	    Type	Description
+        window	    long	[optional] Split the startAt/endAt range into windows of this many miliseconds, fetched concurrently
+        parallelism	int	    [optional] Max number of windows fetched at once. Default 4"""
+
+        def fetch(**params):
+            return self.get_premium_index(symbol, **params)
+
+        return self._iterate(fetch, kwargs, 'timePoint', window, parallelism)
+
     def get_current_fund_rate(self, symbol):
         """
         Submit request to check the current mark price."""
@@ -196,16 +253,42 @@ class MarketClient:
 
     def get_contracts_list(self):
         """
-        Submit request to get the info of all open contracts."""
+        Submit request to get the info of all open contracts.
+        Served from the response cache when the client was created with one."""
 
-        return self._request('GET', '/api/v1/contracts/active')
+        return self._cached('get_contracts_list', None, lambda: self._request('GET', '/api/v1/contracts/active'))
 
     def get_contract_detail(self, symbol):
         """
-        Submit request to get info of the specified contract."""
+        Submit request to get info of the specified contract.
+        Served from the response cache when the client was created with one."""
 
-        params = {
-            'symbol': symbol
-        }
+        return self._cached('get_contract_detail', symbol,
+                            lambda: self._request('GET', f'/api/v1/contracts/{symbol}'))
 
-        return self._request('GET', '/api/v1/ticker', params)
+    def get_contract_specs(self):
+        """
+        symbol -> ContractSpec for all open contracts, for converting prices to integer ticks and
+        sizes to integer lots."""
+
+        return ContractSpec.load_all(self.get_contracts_list())
+
+
+class AsyncMarketClient(MarketClient):
+    """
+    Same endpoints as MarketClient, every method returns a coroutine to be awaited and the
+    iter_* methods return async iterators."""
+
+    _iterate = staticmethod(aiterate)
+
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, request=None, cache=None):
+        super().__init__(request=request or AsyncSendRequest(key, secret, passphrase, base_url), cache=cache)
+
+    def _cached(self, name, key, load):
+        if self._cache is None or name not in self._cache:
+            return load()
+
+        return self._cache.aget(name, key, load)
+
+    async def get_contract_specs(self):
+        return ContractSpec.load_all(await self.get_contracts_list())
@@ -0,0 +1,178 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+_default_page_size = 100
+
+
+def _page_items(page):
+    if isinstance(page, dict):
+        return page.get('dataList') or [], bool(page.get('hasMore'))
+
+    return page or [], False
+
+
+def _check_window(params, window):
+    if window <= 0:
+        raise ValueError(f'window must be positive, got {window}')
+
+    start_at = params.get('startAt')
+    end_at = params.get('endAt')
+
+    if start_at is None or end_at is None:
+        raise ValueError('Windowed iteration needs both startAt and endAt')
+    if start_at > end_at:
+        raise ValueError(f'startAt {start_at} is after endAt {end_at}')
+
+
+def _windows(params, window):
+    _check_window(params, window)
+
+    start_at = params['startAt']
+    end_at = params['endAt']
+
+    windows = []
+    while start_at <= end_at:
+        window_end = min(start_at + window - 1, end_at)
+        windows.append((start_at, window_end))
+        start_at = window_end + 1
+
+    # the exchange returns newest first unless reverse is switched off
+    if params.get('reverse', True):
+        windows.reverse()
+
+    return windows
+
+
+def _window_params(params, bounds):
+    window_params = dict(params)
+    window_params['startAt'], window_params['endAt'] = bounds
+
+    return window_params
+
+
+def paginate(fetch, params, offset_key):
+    """
+    Yield records from every page of an offset/maxCount endpoint.
+
+    Param	    Type	    Description
+    fetch	    callable	Called with the request params as keyword arguments, returns one page
+    params	    dict	    Request params, offset is advanced from page to page
+    offset_key	String	    Record field holding the offset of the next page"""
+
+    params = dict(params)
+    params.setdefault('maxCount', _default_page_size)
+
+    while True:
+        items, has_more = _page_items(fetch(**params))
+
+        yield from items
+
+        if not has_more or not items:
+            return
+
+        params['offset'] = items[-1][offset_key]
+
+
+def paginate_windows(fetch, params, offset_key, window, parallelism=4):
+    """
+    Split params' startAt/endAt range into windows of `window` milliseconds and fetch up to
+    `parallelism` of them at once. Records are yielded window by window in time order, so at
+    most `parallelism` windows are held in memory."""
+
+    windows = deque(_windows(params, window))
+
+    def fetch_window(bounds):
+        return list(paginate(fetch, _window_params(params, bounds), offset_key))
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        pending = deque()
+
+        try:
+            while windows or pending:
+                while windows and len(pending) < parallelism:
+                    pending.append(executor.submit(fetch_window, windows.popleft()))
+
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def apaginate(fetch, params, offset_key):
+    """
+    Async iterator version of paginate, fetch must return an awaitable."""
+
+    params = dict(params)
+    params.setdefault('maxCount', _default_page_size)
+
+    while True:
+        items, has_more = _page_items(await fetch(**params))
+
+        for item in items:
+            yield item
+
+        if not has_more or not items:
+            return
+
+        params['offset'] = items[-1][offset_key]
+
+
+async def apaginate_windows(fetch, params, offset_key, window, parallelism=4):
+    """
+    Async iterator version of paginate_windows."""
+
+    windows = deque(_windows(params, window))
+
+    async def fetch_window(bounds):
+        return [item async for item in apaginate(fetch, _window_params(params, bounds), offset_key)]
+
+    pending = deque()
+
+    try:
+        while windows or pending:
+            while windows and len(pending) < parallelism:
+                pending.append(asyncio.ensure_future(fetch_window(windows.popleft())))
+
+            for item in await pending.popleft():
+                yield item
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def iterate(fetch, params, offset_key, window=None, parallelism=4):
+    if window is None:
+        return paginate(fetch, params, offset_key)
+
+    # fail at the call rather than on first iteration
+    _check_window(params, window)
+
+    return paginate_windows(fetch, params, offset_key, window, parallelism)
+
+
+def aiterate(fetch, params, offset_key, window=None, parallelism=4):
+    if window is None:
+        return apaginate(fetch, params, offset_key)
+
+    _check_window(params, window)
+
+    return apaginate_windows(fetch, params, offset_key, window, parallelism)
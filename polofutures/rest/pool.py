@@ -0,0 +1,69 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP connection pool shared by every REST client of a RestClient.
+
+    Param	            Type	Description
+    pool_size	        int	    Max number of connections kept open per host
+    pool_idle_timeout	float	[optional] Seconds a pool may sit unused before its connections are dropped"""
+
+    def __init__(self, pool_size=10, pool_idle_timeout=30):
+        self._pool_size = pool_size
+        self._pool_idle_timeout = pool_idle_timeout
+
+        self._session = requests.Session()
+        self._adapter = HTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+        self._session.mount('https://', self._adapter)
+        self._session.mount('http://', self._adapter)
+
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+
+    @property
+    def pool_size(self):
+        return self._pool_size
+
+    def request(self, method, url, **kwargs):
+        self._reap_idle()
+
+        return self._session.request(method, url, **kwargs)
+
+    def _reap_idle(self):
+        if self._pool_idle_timeout is None:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            idle = now - self._last_used
+            self._last_used = now
+
+        # the exchange closes idle keep-alive sockets on its side, reusing one
+        # of those would cost a failed write before urllib3 reconnects
+        if idle > self._pool_idle_timeout:
+            self._adapter.poolmanager.clear()
+
+    def close(self):
+        self._session.close()
@@ -0,0 +1,242 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+
+PRIORITY_CANCEL = 0
+PRIORITY_ORDER = 1
+PRIORITY_DEFAULT = 2
+PRIORITY_HISTORY = 3
+
+# group: (tokens per second, burst size)
+default_buckets = {
+    'public'  : (30, 30),
+    'private' : (30, 30),
+    'snapshot': (3, 3)
+}
+
+# (method, path prefix, group, priority), first match wins
+default_rules = [
+    ('DELETE', '/api/v1/orders',                 'private',  PRIORITY_CANCEL),
+    ('DELETE', '/api/v1/stopOrders',             'private',  PRIORITY_CANCEL),
+    ('POST',   '/api/v1/orders',                 'private',  PRIORITY_ORDER),
+    ('GET',    '/api/v1/funding-history',        'private',  PRIORITY_HISTORY),
+    ('GET',    '/api/v1/transaction-history',    'private',  PRIORITY_HISTORY),
+    ('GET',    '/api/v1/fills',                  'private',  PRIORITY_HISTORY),
+    ('GET',    '/api/v1/recentFills',            'private',  PRIORITY_HISTORY),
+    ('GET',    '/api/v1/recentDoneOrders',       'private',  PRIORITY_HISTORY),
+    ('GET',    '/api/v1/trade/history',          'public',   PRIORITY_HISTORY),
+    ('GET',    '/api/v1/interest/query',         'public',   PRIORITY_HISTORY),
+    ('GET',    '/api/v1/index/query',            'public',   PRIORITY_HISTORY),
+    ('GET',    '/api/v1/premium/query',          'public',   PRIORITY_HISTORY),
+    ('GET',    '/api/v1/level2/snapshot',        'snapshot', PRIORITY_DEFAULT),
+    ('GET',    '/api/v1/level3/snapshot',        'snapshot', PRIORITY_DEFAULT)
+]
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+
+        self._tokens = capacity
+        self._stamp = time.monotonic()
+
+    def delay(self, now):
+        """
+        Seconds until a token is available, 0 when one can be taken right away."""
+
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+        if self._tokens >= 1:
+            return 0
+
+        return (1 - self._tokens) / self.rate
+
+    def take(self):
+        self._tokens -= 1
+
+
+class _Group:
+    def __init__(self, rate, capacity):
+        self.bucket = TokenBucket(rate, capacity)
+        self.queue = []
+
+        self.calls = 0
+        self.waited = 0
+        self.max_wait = 0
+
+
+class _SyncWaiter:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def wake(self):
+        self._event.set()
+
+    def wait(self, timeout):
+        self._event.wait(timeout)
+        self._event.clear()
+
+
+class _AsyncWaiter:
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def wake(self):
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self, timeout):
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        self._event.clear()
+
+
+class RateLimiter:
+    """
+    Client side token-bucket scheduler for REST calls.
+
+    Every call is mapped by (method, path) to a bucket group and a priority. Calls waiting on
+    the same group are served lowest priority value first, so cancels and order placement go
+    ahead of queued history queries.
+
+    Param	Type	Description
+    buckets	dict	[optional] group -> (tokens per second, burst size), merged over default_buckets
+    rules	list	[optional] (method, path prefix, group, priority) tuples replacing default_rules"""
+
+    def __init__(self, buckets=None, rules=None):
+        config = dict(default_buckets)
+        config.update(buckets or {})
+
+        self._groups = {name: _Group(rate, capacity) for name, (rate, capacity) in config.items()}
+        self._rules = rules if rules is not None else default_rules
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+    def classify(self, method, path, auth=False):
+        for rule_method, prefix, group, priority in self._rules:
+            if method == rule_method and path.startswith(prefix):
+                return group, priority
+
+        return 'private' if auth else 'public', PRIORITY_DEFAULT
+
+    def acquire(self, method, path, auth=False):
+        """
+        Block until the call may be sent. Returns the seconds spent waiting."""
+
+        group, entry = self._enqueue(method, path, auth, _SyncWaiter())
+        start = time.monotonic()
+
+        try:
+            while True:
+                granted, timeout = self._poll(group, entry, start)
+                if granted:
+                    return timeout
+
+                entry[2].wait(timeout)
+        except BaseException:
+            self._discard(group, entry)
+            raise
+
+    async def acquire_async(self, method, path, auth=False):
+        """
+        Coroutine version of acquire."""
+
+        group, entry = self._enqueue(method, path, auth, _AsyncWaiter())
+        start = time.monotonic()
+
+        try:
+            while True:
+                granted, timeout = self._poll(group, entry, start)
+                if granted:
+                    return timeout
+
+                await entry[2].wait(timeout)
+        except BaseException:
+            self._discard(group, entry)
+            raise
+
+    def _enqueue(self, method, path, auth, waiter):
+        name, priority = self.classify(method, path, auth)
+        group = self._groups[name]
+        entry = (priority, next(self._seq), waiter)
+
+        with self._lock:
+            heapq.heappush(group.queue, entry)
+
+        return group, entry
+
+    def _poll(self, group, entry, start):
+        # returns (True, seconds waited) once granted, else (False, seconds to sleep or None)
+        with self._lock:
+            if group.queue[0] is not entry:
+                return False, None
+
+            now = time.monotonic()
+            delay = group.bucket.delay(now)
+            if delay > 0:
+                return False, delay
+
+            group.bucket.take()
+            heapq.heappop(group.queue)
+
+            waited = now - start
+            group.calls += 1
+            group.waited += waited
+            group.max_wait = max(group.max_wait, waited)
+
+            if group.queue:
+                group.queue[0][2].wake()
+
+        return True, waited
+
+    def _discard(self, group, entry):
+        with self._lock:
+            if entry not in group.queue:
+                return
+
+            group.queue.remove(entry)
+            heapq.heapify(group.queue)
+
+            if group.queue:
+                group.queue[0][2].wake()
+
+    def stats(self):
+        """
+        Per group queue counters: calls granted, total and max seconds waited, current queue depth."""
+
+        with self._lock:
+            return {
+                name: {
+                    'calls'   : group.calls,
+                    'waited'  : group.waited,
+                    'max_wait': group.max_wait,
+                    'queued'  : len(group.queue)
+                }
+                for name, group in self._groups.items()
+            }
@@ -17,12 +17,17 @@
 
 from uuid import uuid4
 
-from polofutures.rest.core import SendRequest
+from polofutures.rest.batch import run_batch, arun_batch
+from polofutures.rest.core import SendRequest, AsyncSendRequest
+from polofutures.rest.paginate import iterate, aiterate
 
 
 class TradeClient:
-    def __init__(self, key=None, secret=None, passphrase=None, base_url=None):
-        self._request = SendRequest(key, secret, passphrase, base_url)
+    _iterate = staticmethod(iterate)
+    _batch = staticmethod(run_batch)
+
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, request=None):
+        self._request = request or SendRequest(key, secret, passphrase, base_url)
 
     def get_fund_history(self, symbol, **kwargs):
         """
@@ -44,6 +49,19 @@ class TradeClient:
 
         return self._request('GET', '/api/v1/funding-history', params, True)
 
+    def iter_fund_history(self, symbol, window=None, parallelism=4, **kwargs):
+        """
+        Iterate the funding history across all pages, takes the same params as get_fund_history.
+
+        Param	    Type	Description
+        window	    long	[optional] Split the startAt/endAt range into windows of this many miliseconds, fetched concurrently
+        parallelism	int	    [optional] Max number of windows fetched at once. Default 4"""
+
+        def fetch(**params):
+            return self.get_fund_history(symbol, **params)
+
+        return self._iterate(fetch, kwargs, 'id', window, parallelism)
+
     def get_position_details(self, symbol):
         """
         Get the position details of a specified position."""
@@ -195,6 +213,28 @@ class TradeClient:
 
         return self._request('POST', '/api/v1/orders', params, True)
 
+    def create_limit_orders(self, orders, concurrency=8):
+        """
+        Place several limit orders at once over the pooled connections.
+
+        Each item of orders is a dict of create_limit_order arguments (symbol, side, leverage, size, price and
+        optionally client_oid plus any extra order fields). A clientOid is generated up front for items without one,
+        so a failed item can be resent with the same id.
+        Returns one BatchResult(id=clientOid, result, error) per order, in input order.
+
+        Param	    Type	Description
+        orders	    list	Order specs
+        concurrency	int	    [optional] Max orders in flight. Default 8"""
+
+        calls = []
+        for order in orders:
+            order = dict(order)
+            order['client_oid'] = str(order.get('client_oid') or uuid4())
+
+            calls.append((order['client_oid'], lambda order=order: self.create_limit_order(**order)))
+
+        return self._batch(calls, concurrency)
+
     def cancel_order(self, order_id):
         """
         Cancel an order (including a stop order).
@@ -207,6 +247,19 @@ class TradeClient:
 
         return self._request('DELETE', f'/api/v1/orders/{order_id}', auth=True)
 
+    def cancel_orders(self, order_ids, concurrency=8):
+        """
+        Cancel several orders at once over the pooled connections.
+        Returns one BatchResult(id=orderId, result, error) per order id, in input order.
+
+        Param	    Type	Description
+        order_ids	list	Server-assigned order ids
+        concurrency	int	    [optional] Max cancels in flight. Default 8"""
+
+        calls = [(order_id, lambda order_id=order_id: self.cancel_order(order_id)) for order_id in order_ids]
+
+        return self._batch(calls, concurrency)
+
     def cancel_all_limit_orders(self, symbol):
         """
         Cancel all open orders (excluding stop orders). The response is a list of orderIDs of the canceled orders."""
@@ -270,3 +323,15 @@ class TradeClient:
         order_id	String	Order ID"""
 
         return self._request('GET', f'/api/v1/orders/{order_id}', auth=True)
+
+
+class AsyncTradeClient(TradeClient):
+    """
+    Same endpoints as TradeClient, every method returns a coroutine to be awaited and the
+    iter_* methods return async iterators."""
+
+    _iterate = staticmethod(aiterate)
+    _batch = staticmethod(arun_batch)
+
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, request=None):
+        super().__init__(request=request or AsyncSendRequest(key, secret, passphrase, base_url))
@@ -15,12 +15,15 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE
 
-from polofutures.rest.core import SendRequest
+from polofutures.rest.core import SendRequest, AsyncSendRequest
+from polofutures.rest.paginate import iterate, aiterate
 
 
 class UserClient:
-    def __init__(self, key=None, secret=None, passphrase=None, base_url=None):
-        self._request = SendRequest(key, secret, passphrase, base_url)
+    _iterate = staticmethod(iterate)
+
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, request=None):
+        self._request = request or SendRequest(key, secret, passphrase, base_url)
 
     def get_account_overview(self, **kwargs):
         """
@@ -44,3 +47,27 @@ class UserClient:
         currency	String	[Optional] Currency of transaction history XBT or USDT"""
 
         return self._request('GET', '/api/v1/transaction-history', kwargs, True)
+
+    def iter_transaction_history(self, window=None, parallelism=4, **kwargs):
+        """
+        Iterate the transaction history across all pages, takes the same params as get_transaction_history.
+
+        Param	    Type	Description
+        window	    long	[optional] Split the startAt/endAt range into windows of this many miliseconds, fetched concurrently
+        parallelism	int	    [optional] Max number of windows fetched at once. Default 4"""
+
+        def fetch(**params):
+            return self.get_transaction_history(**params)
+
+        return self._iterate(fetch, kwargs, 'offset', window, parallelism)
+
+
+class AsyncUserClient(UserClient):
+    """
+    Same endpoints as UserClient, every method returns a coroutine to be awaited and the
+    iter_* methods return async iterators."""
+
+    _iterate = staticmethod(aiterate)
+
+    def __init__(self, key=None, secret=None, passphrase=None, base_url=None, request=None):
+        super().__init__(request=request or AsyncSendRequest(key, secret, passphrase, base_url))
@@ -19,12 +19,20 @@ import os
 import ssl
 import certifi
 import asyncio
-import json
+import logging
+import random
+import time
+from collections import deque
 from uuid import uuid4
 
 import websockets
 
-from polofutures.rest.core import SendRequest
+from polofutures.codec import default_codec
+from polofutures.models import wrap_message
+from polofutures.rest.core import ApiError, AsyncSendRequest
+from polofutures.ws.queue import MessageQueue, QueueClosed
+
+logger = logging.getLogger(__name__)
 
 ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS)
 ssl_context.verify_mode = ssl.CERT_REQUIRED
@@ -34,52 +42,124 @@ ssl_context.load_verify_locations(os.path.relpath(certifi.where()))
 
 
 class WsClient:
-    def __init__(self, on_message, key=None, secret=None, passphrase=None, base_url=None):
+    """
+    Websocket feed client.
+
+    Messages are either passed to on_message from the receive loop, or, when on_message is None,
+    queued for `async for msg in client`. In that mode queue_size bounds the backlog and overflow
+    picks what happens when it is full: block (stop reading the socket), drop-oldest or drop-newest.
+    conflate lists topic prefixes (e.g. '/contractMarket/ticker', '/contract/instrument') for which only
+    the newest queued message per topic and subject is delivered.
+    A MessageQueue passed as queue is used instead, which lets several clients feed one consumer.
+
+    After a failure the client reconnects with full-jitter exponential backoff between backoff_base and
+    backoff_max seconds, using a bullet token fetched ahead of time while connected (refreshed once it is
+    older than token_max_age seconds), and replays all topics at once.
+
+    subscribe and unsubscribe wait for the server ack carrying the same id, at most ack_timeout seconds,
+    and raise ApiError if the server answers with an error. Ack frames are not passed on as messages.
+
+    Every connection is pinged at the pingInterval announced with the bullet token. A pong that does not
+    arrive within pingTimeout marks the socket dead and it is dropped and reconnected. Round trip times of
+    the last 100 pings are kept in rtt_history.
+
+    A Recorder passed as recorder gets every raw frame as received, before decoding.
+
+    With models=True the data of level2, execution, ticker, order and position messages is replaced
+    by the matching polofutures.models record, which still answers data['key'] lookups. Records hold
+    the wire values in slots rather than the payload dict, so they take less memory than the dict but
+    cost extra time to build. models=False remains the cheapest way to receive messages."""
+
+    def __init__(self, on_message=None, key=None, secret=None, passphrase=None, base_url=None, codec=None,
+                 instrumentation=None, on_connect=None, on_disconnect=None, queue_size=10000, overflow='block',
+                 conflate=None, queue=None, backoff_base=0.1, backoff_max=30, token_max_age=600, ack_timeout=10,
+                 recorder=None, models=False):
         self._on_message = on_message
 
-        self._request = SendRequest(key, secret, passphrase, base_url)
+        self._queue = None
+        if on_message is None:
+            self._queue = queue if queue is not None else MessageQueue(queue_size, overflow, conflate)
+        self._on_connect = on_connect
+        self._on_disconnect = on_disconnect
+        self._codec = codec or default_codec
+        self._instrumentation = instrumentation
+        self._recorder = recorder
+        self._models = models
+
+        self._request = AsyncSendRequest(key, secret, passphrase, base_url, codec=self._codec,
+                                         instrumentation=instrumentation)
         self._private = key is not None
 
         self._websocket = None
         self._conn_task = None
         self._conn_event = None
-        self._ping_task = None
+        self._ping_interval = 50
+        self._ping_timeout = 10
+        self._rtts = deque(maxlen=100)
         self._keep_alive = False
 
         self._topics = {}
 
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._token_max_age = token_max_age
+        self._spare_token = None
+        self._spare_token_time = 0
+        self._token_task = None
+
+        self._attempt = 0
+        self._lost_at = None
+        self._reconnects = deque(maxlen=100)
+
+        self._ack_timeout = ack_timeout
+        # message id -> future resolved by the matching ack or error frame
+        self._pending = {}
+
     async def connect(self):
-        if self._websocket is not None:
+        if self._conn_task is not None:
             raise RuntimeError('Already connected to websocket')
 
         self._conn_event = asyncio.Event()
         self._keep_alive = True
+
+        if self._queue is not None:
+            self._queue.reopen()
+
         self._conn_task = asyncio.create_task(self._connect())
-        self._ping_task = asyncio.create_task(self._ping())
 
         try:
             await asyncio.wait_for(self._conn_event.wait(), timeout=60)
         except asyncio.TimeoutError:
             self._keep_alive = False
 
-            await self._cancel_ping_task()
             await self._cancel_conn_task()
+            await self._cancel_token_task()
             self._conn_event = None
 
+            await self._request.close()
+
             raise RuntimeError('Failed to connect to websocket')
 
     async def disconnect(self):
-        if self._websocket is None:
-            raise RuntimeError('Not connected to websocket')
+        """
+        Stop the client, including one that is waiting to reconnect. Does nothing when it is not running."""
+
+        if self._conn_task is None:
+            return
 
         self._keep_alive = False
 
-        await self._cancel_ping_task()
         await self._cancel_conn_task()
+        await self._cancel_token_task()
         self._conn_event = None
 
         self._topics.clear()
 
+        if self._queue is not None:
+            self._queue.close()
+
+        await self._request.close()
+
     async def _cancel_conn_task(self):
         self._conn_task.cancel()
 
@@ -90,23 +170,53 @@ class WsClient:
 
         self._conn_task = None
 
-    async def _cancel_ping_task(self):
-        self._ping_task.cancel()
+    async def _cancel_token_task(self):
+        if self._token_task is None:
+            return
+
+        self._token_task.cancel()
 
         try:
-            await self._ping_task
+            await self._token_task
         except asyncio.CancelledError:
             pass
 
-        self._ping_task = None
+        self._token_task = None
+        self._spare_token = None
 
-    def _get_ws_url(self):
+    async def _fetch_token(self):
         path = '/api/v1/bullet-public'
 
         if self._private:
             path = '/api/v1/bullet-private'
 
-        token = self._request('POST', path, auth=self._private)
+        return await self._request('POST', path, auth=self._private)
+
+    async def _prefetch_tokens(self):
+        while self._keep_alive:
+            age = time.monotonic() - self._spare_token_time
+
+            if self._spare_token is not None and age < self._token_max_age:
+                await asyncio.sleep(self._token_max_age - age)
+                continue
+
+            try:
+                self._spare_token = await self._fetch_token()
+                self._spare_token_time = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if self._instrumentation is not None:
+                    self._instrumentation.record_retry('ws.token')
+
+                await asyncio.sleep(min(self._backoff_max, 5))
+
+    async def _get_ws_url(self):
+        token = self._spare_token
+        self._spare_token = None
+
+        if token is None or time.monotonic() - self._spare_token_time >= self._token_max_age:
+            token = await self._fetch_token()
 
         params = {
             'connectId': uuid4(),
@@ -116,47 +226,200 @@ class WsClient:
         params = [f'{key}={value}' for key, value in params.items()]
         params = '&'.join(params)
 
-        url = token['instanceServers'][0]['endpoint']
+        server = token['instanceServers'][0]
+        self._ping_interval = server.get('pingInterval', 50000) / 1000
+        self._ping_timeout = server.get('pingTimeout', 10000) / 1000
+
+        url = server['endpoint']
         url = f'{url}?{params}'
 
         return url
 
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self._backoff_max, self._backoff_base * 2 ** attempt))
+
+    async def _resubscribe(self):
+        topics = list(self._topics.items())
+
+        results = await asyncio.gather(*[self.subscribe(topic, **kwargs) for topic, kwargs in topics],
+                                       return_exceptions=True)
+
+        # topics the server rejects are dropped by subscribe, anything else means the connection is bad
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, ApiError):
+                raise result
+
+    async def _restore(self, socket):
+        try:
+            await self._resubscribe()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await socket.close()
+            return
+
+        self._attempt = 0
+        if self._lost_at is not None:
+            self._record_reconnect(time.monotonic() - self._lost_at)
+            self._lost_at = None
+
+        if self._token_task is not None:
+            self._token_task.cancel()
+        self._token_task = asyncio.create_task(self._prefetch_tokens())
+
+        if self._on_connect is not None:
+            self._on_connect(self)
+
     async def _connect(self):
+        self._attempt = 0
+        self._lost_at = None
+
         while self._keep_alive:
             try:
-                url = self._get_ws_url()
-            except:
-                await asyncio.sleep(1)
+                url = await self._get_ws_url()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if self._instrumentation is not None:
+                    self._instrumentation.record_retry('ws.token')
+
+                await asyncio.sleep(self._backoff(self._attempt))
+                self._attempt += 1
                 continue
 
+            connected = False
+            restore = None
+            heartbeat = None
+
             try:
-                async with websockets.connect(url, ssl=ssl_context) as socket:
+                ssl_arg = ssl_context if url.startswith('wss://') else None
+
+                async with websockets.connect(url, ssl=ssl_arg) as socket:
                     self._websocket = socket
                     self._conn_event.set()
+                    connected = True
 
-                    for topic, kwargs in self._topics.items():
-                        await self.subscribe(topic, **kwargs)
+                    # acks for the replayed topics arrive through the receive loop below
+                    restore = asyncio.create_task(self._restore(socket))
+                    heartbeat = asyncio.create_task(self._heartbeat(socket))
+
+                    loads = self._codec.loads
+                    instrumentation = self._instrumentation
+                    queue = self._queue
+                    recorder = self._recorder
+                    models = self._models
 
                     while self._keep_alive:
                         try:
                             msg = await socket.recv()
-                            msg = json.loads(msg)
-                        except json.decoder.JSONDecodeError:
-                            pass
+
+                            if instrumentation is not None:
+                                instrumentation.record_ws_frame(len(msg))
+                            if recorder is not None:
+                                try:
+                                    recorder.record(msg)
+                                except Exception:
+                                    # a broken recording must not take the live feed down with it
+                                    logger.exception('Recorder failed, recording stopped')
+                                    recorder = self._recorder = None
+                                    if instrumentation is not None:
+                                        instrumentation.record_ws_error('recorder_errors')
+
+                            msg = loads(msg)
+                        except ValueError:
+                            if instrumentation is not None:
+                                instrumentation.record_ws_error('decode_errors')
                         else:
+                            kind = msg.get('type')
+                            if kind == 'ack' or kind == 'pong' or kind == 'error' and msg.get('id') in self._pending:
+                                self._resolve_ack(msg)
+                                continue
+
+                            if models:
+                                wrap_message(msg)
+
+                            if queue is not None:
+                                if not queue.put_nowait(msg):
+                                    await queue.put(msg)
+                                continue
+
+                            if instrumentation is None:
+                                try:
+                                    self._on_message(msg)
+                                except Exception:
+                                    pass
+                                continue
+
+                            start = time.perf_counter()
                             try:
                                 self._on_message(msg)
-                            except:
-                                pass
-            except:
-                # sleep before reconnecting
-                await asyncio.sleep(1)
+                            except Exception:
+                                instrumentation.record_ws_error('handler_errors')
+                            instrumentation.record_ws_handler(time.perf_counter() - start)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._websocket = None
+                self._conn_event.clear()
+                self._fail_pending()
+
+                if connected and self._keep_alive and self._on_disconnect is not None:
+                    self._on_disconnect(self)
+
+                if self._instrumentation is not None:
+                    self._instrumentation.record_retry('ws.reconnect')
+
+                if self._lost_at is None:
+                    self._lost_at = time.monotonic()
+
+                await asyncio.sleep(self._backoff(self._attempt))
+                self._attempt += 1
                 continue
             finally:
                 self._websocket = None
                 self._conn_event.clear()
 
+                if restore is not None:
+                    restore.cancel()
+                if heartbeat is not None:
+                    heartbeat.cancel()
+
+    def _resolve_ack(self, msg):
+        future = self._pending.pop(msg.get('id'), None)
+        if future is None or future.done():
+            return
+
+        if msg.get('type') != 'error':
+            future.set_result(msg)
+        else:
+            future.set_exception(ApiError(msg))
+
+    def _fail_pending(self):
+        pending = self._pending
+        self._pending = {}
+
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError('Websocket connection lost before ack'))
+                # the waiter may be cancelled before it reads the error, don't warn about it then
+                future.exception()
+
+    async def _request_ack(self, msg, timeout):
+        future = asyncio.get_running_loop().create_future()
+        self._pending[msg['id']] = future
+
+        try:
+            await self._send_message(msg)
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._pending.pop(msg['id'], None)
+
     async def subscribe(self, topic, **kwargs):
+        """
+        Subscribe to a topic and wait for the server ack, which is returned. Many subscriptions may be
+        awaited concurrently, e.g. with asyncio.gather. A topic that times out stays registered and is
+        replayed on reconnect, a rejected one raises ApiError and is dropped."""
+
         msg = {
             'id': str(uuid4()),
             'privateChannel': False,
@@ -168,11 +431,21 @@ class WsClient:
             'topic': topic
         })
 
-        await self._send_message(msg)
-
         self._topics[topic] = kwargs
 
+        try:
+            if not msg.get('response'):
+                return await self._send_message(msg)
+
+            return await self._request_ack(msg, self._ack_timeout)
+        except RuntimeError:
+            self._topics.pop(topic, None)
+            raise
+
     async def unsubscribe(self, topic, **kwargs):
+        """
+        Unsubscribe from a topic and wait for the server ack, which is returned."""
+
         msg = {
             'id': str(uuid4()),
             'privateChannel': False,
@@ -184,31 +457,119 @@ class WsClient:
             'topic': topic
         })
 
-        await self._send_message(msg)
+        self._topics.pop(topic, None)
 
-        if topic in self._topics:
-            del self._topics[topic]
+        if not msg.get('response'):
+            return await self._send_message(msg)
 
-    async def _ping(self):
-        while self._keep_alive:
-            await self._conn_event.wait()
+        return await self._request_ack(msg, self._ack_timeout)
+
+    def __aiter__(self):
+        if self._queue is None:
+            raise RuntimeError('Messages are delivered to on_message, iteration needs on_message=None')
+
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._queue.get()
+        except QueueClosed:
+            raise StopAsyncIteration
+
+    def queue_stats(self):
+        """
+        Depth, high water mark, received, dropped and coalesced counters of the consumption queue."""
+
+        return self._queue.stats() if self._queue is not None else None
+
+    def _record_reconnect(self, elapsed):
+        self._reconnects.append(elapsed)
+
+        if self._instrumentation is not None:
+            self._instrumentation.record_ws_reconnect(elapsed)
+
+    def reconnect_stats(self):
+        """
+        Number of reconnects among the last 100 and their durations in seconds, measured from the
+        failure being noticed until all topics were subscribed again."""
+
+        durations = list(self._reconnects)
+
+        return {
+            'reconnects': len(durations),
+            'last'      : durations[-1] if durations else None,
+            'max'       : max(durations) if durations else None,
+            'mean'      : sum(durations) / len(durations) if durations else None
+        }
+
+    @property
+    def rtt(self):
+        """
+        Round trip time of the last ping in seconds."""
+
+        return self._rtts[-1] if self._rtts else None
+
+    @property
+    def rtt_history(self):
+        return list(self._rtts)
+
+    @property
+    def connected(self):
+        return self._websocket is not None
+
+    @property
+    def running(self):
+        """
+        True between connect and disconnect, also while the connection is being re-established."""
+
+        return self._conn_task is not None
+
+    @property
+    def topics(self):
+        return dict(self._topics)
+
+    def discard_topic(self, topic):
+        """
+        Forget a topic without sending unsubscribe, it is no longer replayed on reconnect."""
+
+        self._topics.pop(topic, None)
+
+    async def _heartbeat(self, socket):
+        while True:
+            await asyncio.sleep(self._ping_interval)
 
             msg = {
                 'type': 'ping',
                 'id': str(uuid4())
             }
 
+            start = time.perf_counter()
+
             try:
-                await asyncio.wait_for(self._send_message(msg), timeout=10)
-            except:
-                pass
+                await self._request_ack(msg, self._ping_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if self._instrumentation is not None:
+                    self._instrumentation.record_ws_error('missed_pongs')
+
+                # no close handshake, a half-open socket would not answer it either
+                socket.transport.abort()
+                return
 
-            await asyncio.sleep(50)
+            rtt = time.perf_counter() - start
+            self._rtts.append(rtt)
+
+            if self._instrumentation is not None:
+                self._instrumentation.record_ws_rtt(rtt)
 
     async def _send_message(self, msg):
         if self._websocket is None:
             raise RuntimeError('Not connected to websocket')
 
-        msg = json.dumps(msg)
+        msg = self._codec.dumps(msg)
+
+        await self._websocket.send(msg)
 
-        await self._websocket.send(msg)
\ No newline at end of file
+        if self._instrumentation is not None:
+            self._instrumentation.record_ws_send(len(msg))
@@ -0,0 +1,323 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+
+from polofutures.ws.client import WsClient
+from polofutures.ws.queue import MessageQueue, QueueClosed
+
+
+default_weights = {
+    '/contractMarket/level3v2' : 20,
+    '/contractMarket/level2'   : 10,
+    '/contractMarket/execution': 3,
+    '/contractMarket/ticker'   : 2
+}
+
+
+class WsPool:
+    """
+    Spreads websocket subscriptions over several connections.
+
+    Topics are sharded by symbol (every topic of a symbol shares a connection) or by topic, onto the
+    connection with the lowest total weight. All connections deliver to the same on_message, or with
+    on_message=None to one shared queue read by `async for msg in pool`, so the pool is consumed like a
+    single WsClient. When a connection drops its topics move to the live
+    connections, and the load is evened out again once it is back.
+
+    Param	    Type	    Description
+    on_message	callable	Called with every message from every connection
+    size	    int	        [optional] Number of connections. Default 4
+    shard_by	String	    [optional] 'symbol' or 'topic'. Default 'symbol'
+    weights	    dict	    [optional] Topic prefix -> weight, merged over default_weights, other topics weigh 1
+    max_topics	int	        [optional] Subscription cap per connection
+    queue_size	int	        [optional] Shared queue bound when on_message is None. Default 10000
+    overflow	String	    [optional] Shared queue overflow policy, see WsClient. Default block
+    conflate	list	    [optional] Topic prefixes conflated in the shared queue, see WsClient
+
+    Any other keyword argument (key, secret, passphrase, base_url, codec, ...) is passed to each WsClient."""
+
+    def __init__(self, on_message=None, size=4, shard_by='symbol', weights=None, max_topics=None,
+                 queue_size=10000, overflow='block', conflate=None, **kwargs):
+        if shard_by not in ('symbol', 'topic'):
+            raise ValueError(f'Unknown shard_by {shard_by!r}')
+
+        self._shard_by = shard_by
+        self._weights = dict(default_weights)
+        self._weights.update(weights or {})
+        self._max_topics = max_topics
+
+        self._queue = MessageQueue(queue_size, overflow, conflate) if on_message is None else None
+
+        self._clients = [
+            WsClient(on_message, on_connect=self._on_client_connect, on_disconnect=self._on_client_disconnect,
+                     queue=self._queue, **kwargs)
+            for _ in range(size)
+        ]
+
+        # topic -> (client, subscribe kwargs)
+        self._assignments = {}
+        # created on first use, inside the running loop
+        self._lock_instance = None
+        self._tasks = set()
+
+    @property
+    def _lock(self):
+        if self._lock_instance is None:
+            self._lock_instance = asyncio.Lock()
+
+        return self._lock_instance
+
+    @property
+    def clients(self):
+        return list(self._clients)
+
+    async def connect(self):
+        await asyncio.gather(*[client.connect() for client in self._clients])
+
+    async def disconnect(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+        # clients in backoff or reconnecting are not connected but still have to be stopped
+        await asyncio.gather(*[client.disconnect() for client in self._clients if client.running],
+                             return_exceptions=True)
+        self._assignments.clear()
+
+    def __aiter__(self):
+        if self._queue is None:
+            raise RuntimeError('Messages are delivered to on_message, iteration needs on_message=None')
+
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._queue.get()
+        except QueueClosed:
+            raise StopAsyncIteration
+
+    def queue_stats(self):
+        return self._queue.stats() if self._queue is not None else None
+
+    async def subscribe(self, topic, **kwargs):
+        async with self._lock:
+            previous = self._assignments.get(topic)
+            client = self._pick(topic, self._live_clients())
+            entry = self._assignments[topic] = (client, kwargs)
+
+        try:
+            await client.subscribe(topic, **kwargs)
+        except BaseException:
+            # a rejected or failed topic must not count toward the caps or be moved around later
+            if previous is None or previous[0] is not client:
+                client.discard_topic(topic)
+
+            if self._assignments.get(topic) is entry:
+                if previous is None:
+                    del self._assignments[topic]
+                else:
+                    self._assignments[topic] = previous
+            raise
+
+    async def unsubscribe(self, topic, **kwargs):
+        async with self._lock:
+            client, _ = self._assignments.pop(topic, (None, None))
+
+        if client is None:
+            return
+
+        if client.connected:
+            await client.unsubscribe(topic, **kwargs)
+        else:
+            client.discard_topic(topic)
+
+    def assignments(self):
+        """
+        Topic -> index of the connection carrying it."""
+
+        return {topic: self._clients.index(client) for topic, (client, _) in self._assignments.items()}
+
+    def weight(self, topic):
+        for prefix, weight in self._weights.items():
+            if topic.startswith(prefix):
+                return weight
+
+        return 1
+
+    def _shard_key(self, topic):
+        if self._shard_by == 'symbol' and ':' in topic:
+            return topic.rsplit(':', 1)[1]
+
+        return topic
+
+    def _live_clients(self):
+        live = [client for client in self._clients if client.connected]
+        return live or self._clients
+
+    def _loads(self, clients, assignments):
+        loads = {client: [0, 0] for client in clients}
+
+        for topic, (client, _) in assignments.items():
+            if client in loads:
+                loads[client][0] += self.weight(topic)
+                loads[client][1] += 1
+
+        return loads
+
+    def _pick(self, topic, clients, assignments=None):
+        if assignments is None:
+            assignments = self._assignments
+
+        key = self._shard_key(topic)
+
+        # keep topics of one shard together
+        for other, (client, _) in assignments.items():
+            if other != topic and client in clients and self._shard_key(other) == key:
+                return client
+
+        loads = self._loads(clients, assignments)
+        candidates = [client for client in clients
+                      if self._max_topics is None or loads[client][1] < self._max_topics]
+
+        if not candidates:
+            raise RuntimeError('Every websocket connection reached its subscription cap')
+
+        return min(candidates, key=lambda client: loads[client][0])
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_client_disconnect(self, client):
+        self._spawn(self._evacuate(client))
+
+    def _on_client_connect(self, client):
+        self._spawn(self.rebalance())
+
+    async def _evacuate(self, dead):
+        async with self._lock:
+            live = [client for client in self._clients if client.connected and client is not dead]
+            if not live:
+                return
+
+            # targets are planned on a copy, an assignment only changes once its move succeeded
+            planned = dict(self._assignments)
+            moves = []
+            for topic, entry in self._assignments.items():
+                if entry[0] is not dead:
+                    continue
+
+                try:
+                    target = self._pick(topic, live, planned)
+                except RuntimeError:
+                    continue
+
+                planned[topic] = (target, entry[1])
+                moves.append(self._move(topic, entry, target))
+
+        await asyncio.gather(*moves, return_exceptions=True)
+
+    async def _move(self, topic, entry, target):
+        """
+        Subscribe topic on target, then drop it from the connection of entry. When the subscribe
+        fails the topic stays with its source, which replays it once it reconnects."""
+
+        source, kwargs = entry
+
+        try:
+            await target.subscribe(topic, **kwargs)
+        except Exception:
+            target.discard_topic(topic)
+            return False
+
+        current = self._assignments.get(topic)
+        if current is not entry:
+            # unsubscribed or moved elsewhere while the subscribe was in flight
+            if current is None or current[0] is not target:
+                await self._drop(target, topic, kwargs)
+            return False
+
+        self._assignments[topic] = (target, kwargs)
+        await self._drop(source, topic, kwargs)
+
+        return True
+
+    @staticmethod
+    async def _drop(client, topic, kwargs):
+        if client.connected:
+            try:
+                await client.unsubscribe(topic, **kwargs)
+            except Exception:
+                client.discard_topic(topic)
+        else:
+            client.discard_topic(topic)
+
+    async def rebalance(self):
+        """
+        Even out the weight carried by the live connections. Whole shards are moved from the most to
+        the least loaded connection while that narrows the gap, subscribing on the new connection
+        before unsubscribing from the old one."""
+
+        async with self._lock:
+            live = self._live_clients()
+
+            shards = {}
+            for topic, (client, _) in self._assignments.items():
+                shard = shards.setdefault(self._shard_key(topic), [client, 0, []])
+                shard[1] += self.weight(topic)
+                shard[2].append(topic)
+
+            placement = {key: shard[0] if shard[0] in live else None for key, shard in shards.items()}
+            loads = {client: 0 for client in live}
+
+            # shards stranded on dead connections go to the least loaded live one first
+            for key in sorted(shards, key=lambda key: -shards[key][1]):
+                if placement[key] is None:
+                    placement[key] = min(live, key=loads.get)
+                loads[placement[key]] += shards[key][1]
+
+            while True:
+                high = max(live, key=loads.get)
+                low = min(live, key=loads.get)
+                gap = loads[high] - loads[low]
+
+                room = None
+                if self._max_topics is not None:
+                    room = self._max_topics - sum(len(shards[key][2]) for key in placement if placement[key] is low)
+
+                movable = [key for key, client in placement.items()
+                           if client is high and shards[key][1] < gap and (room is None or len(shards[key][2]) <= room)]
+                if not movable:
+                    break
+
+                key = min(movable, key=lambda key: abs(gap / 2 - shards[key][1]))
+                placement[key] = low
+                loads[high] -= shards[key][1]
+                loads[low] += shards[key][1]
+
+            moves = []
+            for key, (source, _, topics) in shards.items():
+                target = placement[key]
+                if target is source:
+                    continue
+
+                for topic in topics:
+                    moves.append((topic, self._assignments[topic], target))
+
+        for topic, entry, target in moves:
+            await self._move(topic, entry, target)
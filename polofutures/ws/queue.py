@@ -0,0 +1,186 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+from collections import deque
+
+
+OVERFLOW_POLICIES = ('block', 'drop-oldest', 'drop-newest')
+
+
+class QueueClosed(Exception):
+    pass
+
+
+class MessageQueue:
+    """
+    Bounded FIFO between the websocket receive loop and its consumer.
+
+    When full, 'block' makes the receive loop wait for room (and stop reading the socket),
+    'drop-oldest' discards the oldest queued message and 'drop-newest' discards the incoming one.
+
+    Topics starting with one of the conflate prefixes are conflated: only the newest message per
+    (topic, subject) is kept, in the queue position of the first one not yet consumed, so a consumer
+    that fell behind reads one current value instead of every stale update.
+
+    Param	    Type	Description
+    maxsize	    int	    [optional] Max queued messages. Default 10000
+    overflow	String	[optional] block, drop-oldest or drop-newest. Default block
+    conflate	list	[optional] Topic prefixes to conflate, e.g. '/contractMarket/ticker'"""
+
+    def __init__(self, maxsize=10000, overflow='block', conflate=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy {overflow!r}')
+
+        self.maxsize = maxsize
+        self.overflow = overflow
+
+        self._items = deque()
+        # events are created on first use, inside the running loop
+        self._readable_event = None
+        self._writable_event = None
+        self._closed = False
+
+        self._conflate = tuple(conflate or ())
+        self._conflated = {}
+        self._pending = {}
+
+        self.received = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    @property
+    def _readable(self):
+        if self._readable_event is None:
+            self._readable_event = asyncio.Event()
+
+        return self._readable_event
+
+    @property
+    def _writable(self):
+        if self._writable_event is None:
+            self._writable_event = asyncio.Event()
+            self._writable_event.set()
+
+        return self._writable_event
+
+    def __len__(self):
+        return len(self._items)
+
+    def put_nowait(self, msg):
+        """
+        Queue msg without waiting. Returns False only under the block policy when the queue is full,
+        the caller then has to await put()."""
+
+        items = self._items
+
+        if self._conflate:
+            key = self._conflation_key(msg)
+
+            if key is not None:
+                if key in self._pending:
+                    self._pending[key] = msg
+                    self.received += 1
+                    self.coalesced += 1
+                    return True
+
+                if len(items) < self.maxsize or self.overflow == 'drop-oldest':
+                    self._pending[key] = msg
+                    msg = key
+
+        if len(items) >= self.maxsize:
+            if self.overflow == 'block':
+                self._writable.clear()
+                return False
+
+            self.dropped += 1
+            if self.overflow == 'drop-newest':
+                self.received += 1
+                return True
+
+            dropped = items.popleft()
+            if type(dropped) is tuple:
+                del self._pending[dropped]
+
+        items.append(msg)
+        self.received += 1
+
+        if len(items) > self.high_water:
+            self.high_water = len(items)
+
+        self._readable.set()
+        return True
+
+    def _conflation_key(self, msg):
+        topic = msg.get('topic')
+        if topic is None:
+            return None
+
+        conflated = self._conflated.get(topic)
+        if conflated is None:
+            conflated = self._conflated[topic] = topic.startswith(self._conflate)
+
+        if not conflated:
+            return None
+
+        return topic, msg.get('subject')
+
+    async def put(self, msg):
+        while not self.put_nowait(msg):
+            await self._writable.wait()
+
+    async def get(self):
+        """
+        Next message, raises QueueClosed once the queue was closed and drained."""
+
+        items = self._items
+
+        while not items:
+            if self._closed:
+                raise QueueClosed()
+
+            self._readable.clear()
+            await self._readable.wait()
+
+        msg = items.popleft()
+
+        # conflated messages are queued as their (topic, subject) key
+        if type(msg) is tuple:
+            msg = self._pending.pop(msg)
+
+        if len(items) < self.maxsize:
+            self._writable.set()
+
+        return msg
+
+    def close(self):
+        self._closed = True
+        self._readable.set()
+
+    def reopen(self):
+        self._closed = False
+
+    def stats(self):
+        return {
+            'depth'     : len(self._items),
+            'maxsize'   : self.maxsize,
+            'received'  : self.received,
+            'dropped'   : self.dropped,
+            'coalesced' : self.coalesced,
+            'high_water': self.high_water
+        }
@@ -0,0 +1,271 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from polofutures.codec import default_codec
+
+
+SEGMENT_MAGIC = b'PFSEG001'
+SEGMENT_SUFFIX = '.pfseg'
+
+# compressed length, number of frames
+_block_header = struct.Struct('<II')
+# receive time in ns since the epoch, frame length
+_frame_header = struct.Struct('<qI')
+
+
+class Recorder:
+    """
+    Append-only recorder of raw websocket frames.
+
+    Frames are stamped with their receive time and buffered, every full block is zlib compressed
+    and appended to the current segment file. A new segment is started once the current one
+    passes segment_size, and every recorder starts a fresh segment, so a segment is never
+    rewritten. Pass it to WsClient as recorder to capture a feed.
+
+    Param	        Type	Description
+    directory	    String	Directory the segments are written to, created if missing
+    prefix	        String	[optional] Segment file name prefix. Default feed
+    block_size	    int	    [optional] Uncompressed bytes per block. Default 262144
+    segment_size	int	    [optional] Bytes per segment file before rotating. Default 67108864
+    level	        int	    [optional] zlib compression level. Default 6"""
+
+    def __init__(self, directory, prefix='feed', block_size=256 * 1024, segment_size=64 * 1024 * 1024, level=6):
+        self.directory = directory
+        self.prefix = prefix
+        self.block_size = block_size
+        self.segment_size = segment_size
+        self.level = level
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._file = None
+        self._buffer = bytearray()
+        self._count = 0
+
+        self.frames = 0
+        self.bytes_raw = 0
+        self.bytes_written = 0
+        self.segments = []
+
+    def record(self, frame, ts=None):
+        """
+        Buffer one raw frame (str or bytes), ts is the receive time in ns and defaults to now."""
+
+        if isinstance(frame, str):
+            frame = frame.encode('utf-8')
+
+        self._buffer += _frame_header.pack(ts if ts is not None else time.time_ns(), len(frame))
+        self._buffer += frame
+        self._count += 1
+
+        self.frames += 1
+        self.bytes_raw += len(frame)
+
+        if len(self._buffer) >= self.block_size:
+            self.flush()
+
+    __call__ = record
+
+    def flush(self):
+        """
+        Compress and append the buffered frames as one block."""
+
+        if not self._count:
+            return
+
+        if self._file is None or self._file.tell() >= self.segment_size:
+            self._open_segment()
+
+        block = zlib.compress(bytes(self._buffer), self.level)
+        self._file.write(_block_header.pack(len(block), self._count))
+        self._file.write(block)
+        self._file.flush()
+
+        self.bytes_written += _block_header.size + len(block)
+
+        self._buffer.clear()
+        self._count = 0
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+
+        name = f'{self.prefix}-{time.time_ns():020d}{SEGMENT_SUFFIX}'
+        path = os.path.join(self.directory, name)
+
+        self._file = open(path, 'xb')
+        self._file.write(SEGMENT_MAGIC)
+        self.segments.append(path)
+
+    def close(self):
+        self.flush()
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        return {
+            'frames'       : self.frames,
+            'bytes_raw'    : self.bytes_raw,
+            'bytes_written': self.bytes_written,
+            'segments'     : len(self.segments)
+        }
+
+
+def segment_paths(source):
+    """
+    Segment files for a directory, a single segment path or a list of paths, in recording order."""
+
+    if isinstance(source, (list, tuple)):
+        return [path for item in source for path in segment_paths(item)]
+
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source) if name.endswith(SEGMENT_SUFFIX))
+
+    return [source]
+
+
+def read_segment(path):
+    """
+    Yield (ts, frame) from one segment, ts in ns and frame as bytes. A block cut short by a crash
+    ends the segment."""
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= len(SEGMENT_MAGIC):
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+                raise ValueError(f'{path} is not a feed segment')
+
+            offset = len(SEGMENT_MAGIC)
+            end = len(data)
+
+            while offset + _block_header.size <= end:
+                length, count = _block_header.unpack_from(data, offset)
+                offset += _block_header.size
+
+                if offset + length > end:
+                    return
+
+                block = zlib.decompress(data[offset:offset + length])
+                offset += length
+
+                position = 0
+                for _ in range(count):
+                    ts, size = _frame_header.unpack_from(block, position)
+                    position += _frame_header.size
+
+                    yield ts, block[position:position + size]
+                    position += size
+
+
+class Replay:
+    """
+    Feeds recorded segments to the same handlers a live WsClient uses, e.g. a TopicRouter.
+
+    With speed None frames are delivered as fast as they decode, otherwise the gaps between
+    receive times are reproduced, divided by speed (1.0 is wall-clock pace).
+
+    Param	Type	    Description
+    source	String/list	Segment directory, segment path or list of either
+    speed	float	    [optional] Pace relative to the recording, None for as fast as possible
+    codec	Codec	    [optional] JSON backend used to decode frames"""
+
+    def __init__(self, source, speed=None, codec=None):
+        self.paths = segment_paths(source)
+        self.speed = speed
+        self._codec = codec or default_codec
+
+        self.frames = 0
+
+    def raw(self):
+        """
+        Yield (ts, frame) across all segments without decoding."""
+
+        for path in self.paths:
+            yield from read_segment(path)
+
+    def __iter__(self):
+        loads = self._codec.loads
+
+        for _, frame in self.raw():
+            yield loads(frame)
+
+    def _delays(self):
+        speed = self.speed
+        first = None
+        start = None
+
+        for ts, frame in self.raw():
+            delay = 0
+            if speed:
+                if first is None:
+                    first = ts
+                    start = time.monotonic()
+                delay = start + (ts - first) / 1e9 / speed - time.monotonic()
+
+            yield delay, frame
+
+    def run(self, on_message):
+        """
+        Replay everything into on_message, blocking. Returns the number of frames delivered."""
+
+        loads = self._codec.loads
+
+        for delay, frame in self._delays():
+            if delay > 0:
+                time.sleep(delay)
+
+            on_message(loads(frame))
+            self.frames += 1
+
+        return self.frames
+
+    async def arun(self, on_message):
+        """
+        Replay everything into on_message from a coroutine, yielding to the loop between frames
+        when pacing. Returns the number of frames delivered."""
+
+        async for msg in self:
+            on_message(msg)
+
+        return self.frames
+
+    async def __aiter__(self):
+        loads = self._codec.loads
+
+        for delay, frame in self._delays():
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            self.frames += 1
+            yield loads(frame)
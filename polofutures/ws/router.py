@@ -0,0 +1,109 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+
+class TopicRouter:
+    """
+    Dispatches websocket messages to handlers registered per channel and symbol.
+
+    A topic such as '/contractMarket/level2:BTCUSDTPERP' is split once into its channel
+    ('/contractMarket/level2') and symbol ('BTCUSDTPERP'), and the handlers for it are resolved
+    once and cached, so routing a message is a dict lookup. Handlers registered without a symbol
+    receive every symbol of their channel. Messages without a topic (welcome, ack, pong) go to
+    the default handler.
+
+    Pass the router as the on_message callback of WsClient or WsPool.
+
+    Param	Type	    Description
+    default	callable	[optional] Handler for messages no other handler matched"""
+
+    def __init__(self, default=None):
+        self._default = default
+
+        self._handlers = {}
+        self._resolved = {}
+        self.dispatched = {}
+
+    def add_handler(self, channel, handler, symbol=None):
+        self._handlers.setdefault((channel, symbol), []).append(handler)
+        self._resolved.clear()
+
+    def remove_handler(self, channel, handler, symbol=None):
+        handlers = self._handlers.get((channel, symbol))
+
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self._handlers[(channel, symbol)]
+
+            self._resolved.clear()
+
+    def route(self, channel, symbol=None):
+        """
+        Decorator form of add_handler."""
+
+        def decorator(handler):
+            self.add_handler(channel, handler, symbol)
+            return handler
+
+        return decorator
+
+    @staticmethod
+    def parse_topic(topic):
+        """
+        Split a topic into (channel, symbol), symbol is None for topics without one."""
+
+        channel, _, symbol = topic.partition(':')
+        return channel, symbol or None
+
+    def _resolve(self, topic):
+        channel, symbol = self.parse_topic(topic)
+
+        handlers = tuple(self._handlers.get((channel, symbol), ()))
+        if symbol is not None:
+            handlers += tuple(self._handlers.get((channel, None), ()))
+
+        if not handlers and self._default is not None:
+            handlers = (self._default,)
+
+        self._resolved[topic] = handlers
+        self.dispatched.setdefault(topic, 0)
+
+        return handlers
+
+    def __call__(self, msg):
+        topic = msg.get('topic')
+
+        if topic is None:
+            if self._default is not None:
+                self._default(msg)
+            return
+
+        handlers = self._resolved.get(topic)
+        if handlers is None:
+            handlers = self._resolve(topic)
+
+        self.dispatched[topic] += 1
+
+        for handler in handlers:
+            handler(msg)
+
+    def stats(self):
+        """
+        Messages dispatched per topic."""
+
+        return dict(self.dispatched)
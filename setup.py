@@ -20,7 +20,7 @@ from setuptools import setup, find_packages
 setup(
     name='polo-futures-sdk',
     version='v0.1',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*', 'tests', 'tests.*']),
     license='MIT',
     author='Team Poloniex',
     author_email='pysdk-admin@poloniex.com',
@@ -28,8 +28,12 @@ setup(
     description='Poloniex Futures Exchange Python 3 Wrapper',
     install_requires=[
         'requests~=2.23',
+        'aiohttp~=3.8',
         'websockets~=9.1'
     ],
+    extras_require={
+        'fast': ['orjson>=3']
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
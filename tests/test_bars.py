@@ -0,0 +1,51 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+import pytest
+
+from polofutures.bars import BarAggregator
+
+
+# shape of a GET /api/v1/trade/history item, which carries no symbol
+history = [
+    {'sequence': 102, 'tradeId': '5f2c9c4e1d2b3a0001a1b2c4', 'takerOrderId': '5f2c9c4e1d2b3a0001a1b2c5',
+     'makerOrderId': '5f2c9c4e1d2b3a0001a1b2c6', 'price': '30010', 'size': 3, 'side': 'sell',
+     'ts': 1700000001500000000},
+    {'sequence': 101, 'tradeId': '5f2c9c4e1d2b3a0001a1b2c1', 'takerOrderId': '5f2c9c4e1d2b3a0001a1b2c2',
+     'makerOrderId': '5f2c9c4e1d2b3a0001a1b2c3', 'price': '30000', 'size': 2, 'side': 'buy',
+     'ts': 1700000000200000000}
+]
+
+
+def test_seed_from_trade_history():
+    bars = BarAggregator(intervals=['1s'])
+    bars.seed(history, 'BTCUSDTPERP')
+
+    first = bars.bars('BTCUSDTPERP', '1s')[0]
+    assert (first.start, first.open, first.volume) == (1700000000000, 30000.0, 2)
+    assert bars.current('BTCUSDTPERP', '1s').close == 30010.0
+
+
+def test_seed_without_symbol_is_rejected():
+    with pytest.raises(ValueError):
+        BarAggregator().seed(history)
+
+
+def test_item_symbol_takes_precedence():
+    bars = BarAggregator(intervals=['1s'])
+    bars.seed([dict(history[0], symbol='ETHUSDTPERP')], 'BTCUSDTPERP')
+
+    assert bars.current('ETHUSDTPERP', '1s').volume == 3
@@ -0,0 +1,114 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+import asyncio
+import time
+
+from polofutures.rest.cache import ResponseCache
+
+
+def load():
+    return {'code': '200000', 'data': [{'symbol': 'BTCUSDTPERP'}]}
+
+
+def test_loaded_response_is_stored_as_a_copy():
+    cache = ResponseCache()
+
+    first = cache.get('get_contracts_list', (), load)
+    first['data'].append({'symbol': 'ETHUSDTPERP'})
+
+    assert cache.get('get_contracts_list', (), load) == load()
+
+
+def test_hits_share_the_cached_object():
+    cache = ResponseCache()
+    cache.get('get_contracts_list', (), load)
+
+    assert cache.get('get_contracts_list', (), load) is cache.get('get_contracts_list', (), load)
+    assert cache.stats()['get_contracts_list']['hits'] == 2
+
+
+def test_copy_on_read():
+    cache = ResponseCache(copy_on_read=True)
+    cache.get('get_contracts_list', (), load)
+
+    hit = cache.get('get_contracts_list', (), load)
+    hit['data'][0]['symbol'] = 'changed'
+
+    assert cache.get('get_contracts_list', (), load) == load()
+
+
+def test_expired_entry_is_a_miss_without_stale_while_revalidate():
+    calls = []
+
+    def counted():
+        calls.append(1)
+        return load()
+
+    cache = ResponseCache(ttls={'get_contracts_list': 0.01})
+    cache.get('get_contracts_list', (), counted)
+    time.sleep(0.02)
+    cache.get('get_contracts_list', (), counted)
+
+    stats = cache.stats()['get_contracts_list']
+    assert len(calls) == 2
+    assert (stats['hits'], stats['stale_hits'], stats['misses']) == (0, 0, 2)
+
+
+def test_async_loaded_response_is_stored_as_a_copy():
+    async def aload():
+        return load()
+
+    async def run():
+        cache = ResponseCache()
+
+        first = await cache.aget('get_contracts_list', (), aload)
+        first['data'].clear()
+
+        return await cache.aget('get_contracts_list', (), aload)
+
+    assert asyncio.run(run()) == load()
+
+
+def test_async_refresh_task_is_held_until_done():
+    calls = []
+
+    async def aload():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return {'data': len(calls)}
+
+    async def run():
+        cache = ResponseCache(ttls={'get_contracts_list': 0.01}, stale_while_revalidate=True)
+
+        await cache.aget('get_contracts_list', (), aload)
+        time.sleep(0.02)
+
+        stale = await cache.aget('get_contracts_list', (), aload)
+        assert stale == {'data': 1}
+        assert len(cache._tasks) == 1
+
+        # a second caller is served stale too instead of loading while the refresh is in flight
+        assert await cache.aget('get_contracts_list', (), aload) == {'data': 1}
+        assert len(calls) == 1
+
+        await asyncio.gather(*cache._tasks)
+        await asyncio.sleep(0)
+
+        assert not cache._tasks
+        return await cache.aget('get_contracts_list', (), aload)
+
+    assert asyncio.run(run()) == {'data': 2}
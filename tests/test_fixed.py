@@ -0,0 +1,48 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+import pytest
+
+from polofutures.fixed import Grid
+
+
+@pytest.mark.parametrize('value', ['', '-', '.', 'abc', '1.2.3', 'NaN', 'sNaN', 'Infinity', '1e'])
+def test_malformed_strings_raise_value_error(value):
+    with pytest.raises(ValueError):
+        Grid('0.5').to_units(value)
+
+
+@pytest.mark.parametrize('step', ['', 'abc', '0', '-1', 'Infinity'])
+def test_invalid_step_raises_value_error(step):
+    with pytest.raises(ValueError):
+        Grid(step)
+
+
+def test_off_grid_value_raises_value_error():
+    with pytest.raises(ValueError):
+        Grid('0.5').to_units('1.25')
+
+
+@pytest.mark.parametrize('value, units', [('1.5', 3), ('-2', -4), ('0.50', 1), ('1E1', 20), (' 1.0 ', 2), (3, 6)])
+def test_values_convert_to_units(value, units):
+    assert Grid('0.5').to_units(value) == units
+
+
+def test_round_trip():
+    grid = Grid('0.01')
+
+    for value in ['0.00', '0.01', '123.45', '-7.10']:
+        assert grid.to_string(grid.to_units(value)) == value
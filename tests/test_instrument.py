@@ -0,0 +1,46 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+import pytest
+
+from polofutures.instrument import Instrumentation
+
+
+def broken_hook(*args):
+    raise RuntimeError('hook failed')
+
+
+def call(instrumentation):
+    probe = instrumentation.start('GET', '/api/v1/contracts/active', None)
+    try:
+        raise ConnectionError('request failed')
+    except Exception as e:
+        probe.error = e
+        raise
+    finally:
+        probe.finish()
+
+
+def test_failing_hooks_do_not_mask_the_request_error():
+    seen = []
+    instrumentation = Instrumentation(pre_hooks=[broken_hook],
+                                      post_hooks=[broken_hook, lambda *args: seen.append(args)])
+
+    with pytest.raises(ConnectionError):
+        call(instrumentation)
+
+    assert seen[0][:3] == ('GET', '/api/v1/contracts/active', None)
+    assert instrumentation.snapshot()['rest']['GET /api/v1/contracts/active']['errors'] == {'ConnectionError': 1}
@@ -0,0 +1,126 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+import random
+import socket
+import time
+
+import pytest
+
+from polofutures import RestClient
+from polofutures.bars import BarAggregator
+from polofutures.book.l3 import L3OrderBook
+from polofutures.mock.exchange import MockExchange, trade_history_keys
+from polofutures.mock.market import SyntheticMarket, default_contracts
+
+
+def test_level3_messages_rebuild_the_level2_book():
+    spec = default_contracts['BTCUSDTPERP']
+    market = SyntheticMarket('BTCUSDTPERP', spec['price'], spec['tickSize'], spec['lotSize'], spec['multiplier'],
+                             rng=random.Random(1))
+
+    snapshot = market.l3_snapshot()
+    book = L3OrderBook('BTCUSDTPERP')
+    book.load_snapshot(snapshot)
+
+    for _ in range(2000):
+        market.step_level2()
+
+    for msg in market.l3_messages(snapshot['sequence'] + 1, market.sequence):
+        book.apply(msg['type'], msg)
+
+    expected = market.snapshot()
+    for levels, rows in ((book.bids, expected['bids']), (book.asks, expected['asks'])):
+        assert [[level.price, level.size] for level in levels.levels()] == rows
+
+
+def test_start_failure_is_raised_from_enter():
+    with socket.socket() as busy:
+        busy.bind(('127.0.0.1', 0))
+        busy.listen()
+
+        with pytest.raises(OSError):
+            with MockExchange(port=busy.getsockname()[1]):
+                pass
+
+
+@pytest.fixture(scope='module')
+def exchange():
+    with MockExchange(seed=1) as exchange:
+        yield exchange
+
+
+@pytest.fixture(scope='module')
+def rest(exchange):
+    client = RestClient('key', 'secret', 'passphrase', base_url=exchange.base_url)
+    yield client
+    client.close()
+
+
+def minutes(count):
+    end = int(time.time() * 1000) // 60000 * 60000 - 60000
+    return end - (count - 1) * 60000, end
+
+
+def test_series_pages_within_bounds(rest):
+    start, end = minutes(25)
+
+    page = rest.market_api().get_interest_rate('BTCUSDTPERP', startAt=start, endAt=end, maxCount=10)
+    assert page['hasMore']
+    assert [item['timePoint'] for item in page['dataList']] == list(range(end, end - 10 * 60000, -60000))
+
+    points = [item['timePoint'] for item in rest.market_api().iter_interest_rate('BTCUSDTPERP', startAt=start,
+                                                                                   endAt=end, maxCount=10)]
+    assert points == list(range(end, start - 1, -60000))
+
+
+def test_series_forward_and_windowed(rest):
+    start, end = minutes(25)
+
+    forward = rest.market_api().iter_premium_index('BTCUSDTPERP', startAt=start, endAt=end, reverse=False,
+                                                   maxCount=7)
+    assert [item['timePoint'] for item in forward] == list(range(start, end + 1, 60000))
+
+    windowed = rest.market_api().iter_index_list('BTCUSDTPERP', window=5 * 60000, startAt=start, endAt=end,
+                                                 maxCount=3)
+    assert sorted(item['timePoint'] for item in windowed) == list(range(start, end + 1, 60000))
+
+
+def test_private_histories_page(rest):
+    day = 86400000
+    end = int(time.time() * 1000)
+
+    funding = list(rest.trade_api().iter_fund_history('BTCUSDTPERP', startAt=end - 10 * day, endAt=end, maxCount=4))
+    assert len(funding) in (30, 31)
+    assert len({item['id'] for item in funding}) == len(funding)
+
+    transactions = list(rest.user_api().iter_transaction_history(startAt=end - 2 * day, endAt=end, maxCount=2))
+    assert len(transactions) in (6, 7)
+
+
+def test_trade_history_has_the_rest_shape(exchange, rest):
+    market = exchange.markets['BTCUSDTPERP']
+    for _ in range(20):
+        market.step_execution()
+
+    trades = rest.market_api().get_trade_history('BTCUSDTPERP')
+    assert len(trades) == 20
+    assert sorted(trades[0]) == sorted(trade_history_keys)
+
+    bars = BarAggregator(intervals=['1h'])
+    bars.seed(trades, 'BTCUSDTPERP')
+    bars.advance(int(time.time() * 1000) + 3600000)
+    assert sum(bar.trades for bar in bars.bars('BTCUSDTPERP', '1h')) == 20
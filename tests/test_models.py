@@ -0,0 +1,63 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+import pytest
+
+from polofutures.models import Level2Change, Order, wrap_message
+
+
+def test_level2_change_fields():
+    change = Level2Change({'sequence': 1005, 'change': '30005.0,buy,5', 'timestamp': 1700000000000})
+
+    assert (change.sequence, change.price, change.side, change.size) == (1005, 30005.0, 'buy', 5)
+    assert change['change'] == '30005.0,buy,5'
+    assert change.raw == {'sequence': 1005, 'timestamp': 1700000000000, 'change': '30005.0,buy,5'}
+    assert change._extra is None
+
+
+def test_missing_and_empty_values():
+    order = Order({'orderId': 'abc', 'price': ''})
+
+    assert order.id == 'abc'
+    assert order.price is None
+    assert order.size is None
+    assert 'size' not in order
+    assert order.get('size', 0) == 0
+
+    with pytest.raises(KeyError):
+        order['size']
+
+
+def test_undeclared_keys_keep_the_dict_api():
+    data = {'orderId': 'abc', 'remainSize': '5', 'reason': None, 'side': 'sell'}
+    order = Order(data)
+
+    assert order['remainSize'] == '5'
+    assert 'reason' in order and order['reason'] is None
+    assert sorted(order) == sorted(data)
+    assert len(order) == 4
+    assert dict(order.items()) == data
+
+    with pytest.raises(KeyError):
+        order['matchPrice']
+
+
+def test_wrap_message():
+    msg = wrap_message({'type': 'message', 'subject': 'level2',
+                        'data': {'sequence': 7, 'change': '1.5,sell,0', 'timestamp': 1}})
+
+    assert isinstance(msg['data'], Level2Change)
+    assert msg['data'].size == 0
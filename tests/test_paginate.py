@@ -0,0 +1,71 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import asyncio
+
+import pytest
+
+from polofutures.rest.paginate import aiterate, iterate, paginate_windows
+
+
+def fetch(**params):
+    return {'dataList': [{'id': params['startAt']}], 'hasMore': False}
+
+
+async def afetch(**params):
+    return fetch(**params)
+
+
+@pytest.mark.parametrize('window', [0, -1000])
+def test_non_positive_window_is_rejected(window):
+    with pytest.raises(ValueError):
+        iterate(fetch, {'startAt': 0, 'endAt': 10}, 'id', window=window)
+
+
+@pytest.mark.parametrize('params', [{}, {'startAt': 0}, {'endAt': 10}])
+def test_missing_bounds_are_rejected(params):
+    with pytest.raises(ValueError):
+        iterate(fetch, params, 'id', window=5)
+
+
+def test_inverted_bounds_are_rejected():
+    with pytest.raises(ValueError):
+        iterate(fetch, {'startAt': 10, 'endAt': 0}, 'id', window=5)
+
+
+def test_async_iterate_validates_at_call():
+    with pytest.raises(ValueError):
+        aiterate(afetch, {'startAt': 0, 'endAt': 10}, 'id', window=0)
+
+
+def test_paginate_windows_validates_on_iteration():
+    with pytest.raises(ValueError):
+        list(paginate_windows(fetch, {'startAt': 0, 'endAt': 10}, 'id', 0))
+
+
+def test_windows_cover_range_newest_first():
+    items = list(iterate(fetch, {'startAt': 0, 'endAt': 10}, 'id', window=5))
+
+    assert [item['id'] for item in items] == [10, 5, 0]
+
+
+def test_async_windows_cover_range():
+    async def collect():
+        return [item async for item in aiterate(afetch, {'startAt': 0, 'endAt': 10, 'reverse': False}, 'id',
+                                                window=5)]
+
+    assert [item['id'] for item in asyncio.run(collect())] == [0, 5, 10]
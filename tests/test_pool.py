@@ -0,0 +1,114 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+import asyncio
+
+import pytest
+
+from polofutures.mock.exchange import MockExchange
+from polofutures.rest.core import ApiError
+from polofutures.ws.pool import WsPool
+
+
+async def settle(pool):
+    # let on_connect / on_disconnect callbacks spawn their tasks, then wait for them
+    await asyncio.sleep(0.05)
+    while pool._tasks:
+        await asyncio.gather(*pool._tasks, return_exceptions=True)
+
+
+async def reject(topic, **kwargs):
+    raise ApiError({'code': '404', 'msg': f'topic {topic} is not found'})
+
+
+def run(test, **kwargs):
+    async def main():
+        async with MockExchange(feed_rates={'/contractMarket/level2': 0, '/contractMarket/execution': 0,
+                                            '/contractMarket/ticker': 0}) as exchange:
+            pool = WsPool(lambda msg: None, base_url=exchange.base_url, **kwargs)
+            try:
+                await test(pool)
+            finally:
+                await pool.disconnect()
+
+    asyncio.run(main())
+
+
+def test_rejected_topic_is_not_assigned():
+    async def test(pool):
+        await pool.connect()
+
+        with pytest.raises(ApiError):
+            await pool.subscribe('/bogus:AAA')
+
+        await pool.subscribe('/contractMarket/ticker:BTCUSDTPERP')
+        await pool.subscribe('/contractMarket/ticker:ETHUSDTPERP')
+
+        assert sorted(pool.assignments()) == ['/contractMarket/ticker:BTCUSDTPERP', '/contractMarket/ticker:ETHUSDTPERP']
+        assert all('/bogus:AAA' not in client._topics for client in pool.clients)
+
+    run(test, size=2, max_topics=1)
+
+
+def test_failed_rebalance_keeps_the_source_assignment():
+    async def test(pool):
+        first, second = pool.clients
+        topics = [f'/contractMarket/ticker:S{i}' for i in range(4)]
+
+        await first.connect()
+        for topic in topics:
+            await pool.subscribe(topic)
+
+        second.subscribe = reject
+        await second.connect()
+        await settle(pool)
+
+        assert set(pool.assignments().values()) == {0}
+        assert sorted(first._topics) == topics
+        assert not second._topics
+
+        del second.subscribe
+        await pool.rebalance()
+
+        assignments = pool.assignments()
+        moved = sorted(topic for topic, index in assignments.items() if index == 1)
+        assert len(moved) == 2
+        assert sorted(second._topics) == moved
+        assert sorted(first._topics) == sorted(set(topics) - set(moved))
+
+    run(test, size=2, shard_by='topic')
+
+
+def test_failed_evacuation_keeps_the_source_assignment():
+    async def test(pool):
+        first, second = pool.clients
+        await pool.connect()
+
+        for i in range(4):
+            await pool.subscribe(f'/contractMarket/ticker:S{i}')
+
+        stranded = sorted(topic for topic, index in pool.assignments().items() if index == 1)
+        first.subscribe = reject
+
+        second._websocket.transport.abort()
+        await settle(pool)
+
+        assert not second.connected
+        assert sorted(topic for topic, index in pool.assignments().items() if index == 1) == stranded
+        assert set(stranded) <= set(second._topics)
+        assert not set(stranded) & set(first._topics)
+
+    run(test, size=2, shard_by='topic', backoff_base=5, backoff_max=5)
@@ -0,0 +1,165 @@
+# Copyright 2020 Polo Digital Assets, Ltd.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+import asyncio
+import random
+import time
+
+from polofutures.book.l2 import L2OrderBookSync
+from polofutures.mock.market import SyntheticMarket
+
+
+class StubMarket:
+    """
+    AsyncMarketClient stand-in over a SyntheticMarket, counting calls. A snapshot is taken when
+    requested and only returned once gate is set, and the next `failures` snapshots raise."""
+
+    def __init__(self):
+        self.market = SyntheticMarket('BTCUSDTPERP', 30000, 1, rng=random.Random(7))
+        self.gate = None
+        self.failures = 0
+        self.snapshot_times = []
+        self.message_calls = []
+
+    async def get_l2_order_book(self, symbol):
+        self.snapshot_times.append(time.monotonic())
+        snapshot = self.market.snapshot()
+
+        if self.gate is not None:
+            await self.gate.wait()
+
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('snapshot failed')
+
+        return snapshot
+
+    async def get_l2_messages(self, symbol, start, end):
+        self.message_calls.append((start, end))
+        return self.market.messages(start, end)
+
+    def push(self, sync, count=1):
+        for _ in range(count):
+            sync.on_message({'subject': 'level2', 'data': self.market.step_level2()})
+
+    def skip(self, count):
+        for _ in range(count):
+            self.market.step_level2()
+
+
+def assert_in_sync(sync, stub):
+    expected = stub.market.snapshot()
+
+    assert sync.ready
+    assert sync.sequence == expected['sequence']
+    assert [list(level) for level in sync.book.bids.levels()] == expected['bids']
+    assert [list(level) for level in sync.book.asks.levels()] == expected['asks']
+
+
+async def recovered(sync):
+    while sync._task is not None:
+        await asyncio.gather(sync._task, return_exceptions=True)
+
+
+def test_messages_are_buffered_while_the_snapshot_is_in_flight():
+    async def run():
+        stub = StubMarket()
+        stub.gate = asyncio.Event()
+        sync = L2OrderBookSync(stub, 'BTCUSDTPERP')
+
+        start = asyncio.ensure_future(sync.start())
+        await asyncio.sleep(0)
+
+        stub.push(sync, 20)
+        assert not sync.ready
+        assert len(sync._buffer) == 20
+
+        stub.gate.set()
+        await start
+
+        assert_in_sync(sync, stub)
+        assert len(stub.snapshot_times) == 1
+        assert not sync._buffer
+
+    asyncio.run(run())
+
+
+def test_gap_is_filled_from_messages():
+    async def run():
+        stub = StubMarket()
+        sync = L2OrderBookSync(stub, 'BTCUSDTPERP')
+        await sync.start()
+
+        stub.push(sync, 5)
+        missing = sync.sequence + 1
+        stub.skip(10)
+        stub.push(sync)
+        await recovered(sync)
+
+        assert_in_sync(sync, stub)
+        assert stub.message_calls == [(missing, missing + 9)]
+        assert (sync.gaps, sync.resyncs) == (1, 1)
+
+    asyncio.run(run())
+
+
+def test_wide_gap_resyncs_from_a_snapshot():
+    async def run():
+        stub = StubMarket()
+        sync = L2OrderBookSync(stub, 'BTCUSDTPERP', max_gap=5)
+        await sync.start()
+
+        stub.skip(20)
+        stub.push(sync)
+        await recovered(sync)
+
+        assert_in_sync(sync, stub)
+        assert not stub.message_calls
+        assert (sync.gaps, sync.resyncs) == (1, 2)
+
+    asyncio.run(run())
+
+
+def test_failed_snapshot_is_retried_with_backoff():
+    async def run():
+        stub = StubMarket()
+        sync = L2OrderBookSync(stub, 'BTCUSDTPERP', max_gap=5)
+        sync.retry_delay = 0.02
+        sync.retry_max_delay = 0.04
+        await sync.start()
+
+        stub.failures = 3
+        stub.skip(20)
+        stub.push(sync)
+
+        # messages arriving during the retries are buffered, not answered with more snapshots
+        for _ in range(10):
+            await asyncio.sleep(0.005)
+            stub.push(sync)
+
+        await recovered(sync)
+
+        assert_in_sync(sync, stub)
+        assert isinstance(sync.last_error, ConnectionError)
+
+        # the initial snapshot, three failures and the one that succeeded
+        times = stub.snapshot_times
+        assert len(times) == 5
+        delays = [later - earlier for earlier, later in zip(times[1:], times[2:])]
+        for delay, expected in zip(delays, [0.02, 0.04, 0.04]):
+            assert delay >= expected * 0.9
+
+    asyncio.run(run())
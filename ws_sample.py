@@ -18,7 +18,7 @@
 import asyncio
 import os
 
-from polofutures import WsClient
+from polofutures import TopicRouter, WsClient
 
 
 # Account Keys
@@ -30,15 +30,21 @@ SYMBOL = 'BTCUSDTPERP'
 
 
 async def ws_stream():
-    def on_message(msg):
-        if msg['topic'] == f'/contract/instrument:{SYMBOL}':
-            print(f'Get {SYMBOL} Index Price: {msg["data"]}')
-        elif msg['topic'] == f'/contractMarket/execution:{SYMBOL}':
-            print(f'Last Execution: {msg["data"]}')
-        elif msg['topic'] == f'/contractMarket/level2:{SYMBOL}':
-            print(f'Get {SYMBOL} Level 2 :{msg["data"]}')
-
-    ws_client = WsClient(on_message, API_KEY, SECRET, API_PASS)
+    router = TopicRouter()
+
+    @router.route('/contract/instrument', SYMBOL)
+    def on_instrument(msg):
+        print(f'Get {SYMBOL} Index Price: {msg["data"]}')
+
+    @router.route('/contractMarket/execution', SYMBOL)
+    def on_execution(msg):
+        print(f'Last Execution: {msg["data"]}')
+
+    @router.route('/contractMarket/level2', SYMBOL)
+    def on_level2(msg):
+        print(f'Get {SYMBOL} Level 2 :{msg["data"]}')
+
+    ws_client = WsClient(router, API_KEY, SECRET, API_PASS)
 
     await ws_client.connect()
 